@@ -0,0 +1,282 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from board import Board, BitBoard
+from game import GameManager, GameState
+from perft import perft
+from player import Worker, BOARD_SIZE
+from position import Position
+from simulate import play_game
+from turn import RandomTurn, HeuristicTurn
+
+WORKER_NAMES = ['A', 'B', 'Y', 'Z']
+
+
+def random_position(rng):
+    '''Returns a (board, workers) pair with random building heights and worker squares'''
+    board = Board()
+    for x in range(BOARD_SIZE):
+        for y in range(BOARD_SIZE):
+            cell = board.get_specific_cell(x, y)
+            for _ in range(rng.choice([0, 0, 1, 1, 2, 2, 3, 4])):
+                cell.build()
+    # Workers only stand on squares without a dome
+    squares = [(x, y) for x in range(BOARD_SIZE) for y in range(BOARD_SIZE)
+               if board.get_specific_cell(x, y).get_height() < 4]
+    workers = []
+    for name, (x, y) in zip(WORKER_NAMES, rng.sample(squares, len(WORKER_NAMES))):
+        board.set_worker_at_cell(name, x, y)
+        workers.append(Worker(name, x, y))
+    return board, workers
+
+
+def count_object_moves(board, workers):
+    '''Counts (worker, move, build) triples using Worker.enumerate_moves, with the board's legal move cache
+    dropped first so that every call enumerates'''
+    count = 0
+    for worker in workers:
+        board.invalidate_moves(worker.name)
+        for builds in worker.enumerate_moves(board).values():
+            count += len(builds)
+    return count
+
+
+def count_cached_moves(board, workers):
+    '''Counts (worker, move, build) triples using Worker.enumerate_moves, answered from the board's cache'''
+    count = 0
+    for worker in workers:
+        for builds in worker.enumerate_moves(board).values():
+            count += len(builds)
+    return count
+
+
+def count_bitboard_moves(bitboard, worker_names):
+    '''Counts (worker, move, build) triples using BitBoard.generate_moves'''
+    count = 0
+    for _ in bitboard.generate_moves(worker_names):
+        count += 1
+    return count
+
+
+def bench_move_generation(positions=2000, repeat=5, seed=0):
+    '''Times move generation with the object board and the bitboard over the same seeded positions.
+    Returns a dict with the moves generated per second by each representation'''
+    rng = random.Random(seed)
+    samples = [random_position(rng) for _ in range(positions)]
+    bitboards = [(BitBoard.from_board(board), [worker.name for worker in workers]) for board, workers in samples]
+
+    # Both generators must agree before their speeds are compared
+    for (board, workers), (bitboard, names) in zip(samples, bitboards):
+        expected = [(worker.name, move_dir, build_dir) for worker in workers
+                    for move_dir, builds in worker.enumerate_moves(board).items() for build_dir in builds]
+        if list(bitboard.generate_moves(names)) != expected:
+            raise AssertionError("BitBoard.generate_moves disagrees with Worker.enumerate_moves")
+
+    start = time.perf_counter()
+    object_moves = 0
+    for _ in range(repeat):
+        for board, workers in samples:
+            object_moves += count_object_moves(board, workers)
+    object_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bitboard_moves = 0
+    for _ in range(repeat):
+        for bitboard, names in bitboards:
+            bitboard_moves += count_bitboard_moves(bitboard, names)
+    bitboard_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cached_moves = 0
+    for _ in range(repeat):
+        for board, workers in samples:
+            cached_moves += count_cached_moves(board, workers)
+    cached_time = time.perf_counter() - start
+
+    return {
+        'object_moves_per_sec': object_moves / object_time,
+        'bitboard_moves_per_sec': bitboard_moves / bitboard_time,
+        'cached_moves_per_sec': cached_moves / cached_time,
+        'speedup': (bitboard_moves / bitboard_time) / (object_moves / object_time),
+    }
+
+
+def _allocated_bytes(build):
+    '''Returns the bytes still allocated by the objects build() returns'''
+    tracemalloc.start()
+    objects = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return allocated
+
+
+def bench_position_memory(positions=1000000, boards=1000, seed=0):
+    '''Measures the memory of positions held as Position objects and as Board objects.
+    Returns a dict with bytes per position of each and the total for the given number of Positions'''
+    rng = random.Random(seed)
+    samples = [Position.from_board(random_position(rng)[0]) for _ in range(boards)]
+
+    # Every Position gets its own heights and workers, as positions kept for analysis would
+    position_bytes = _allocated_bytes(
+        lambda: [Position(bytearray(samples[i % boards].heights), bytearray(samples[i % boards].workers), i % 100)
+                 for i in range(positions)])
+    board_bytes = _allocated_bytes(lambda: [sample.to_board() for sample in samples])
+    return {
+        'position_bytes': position_bytes / positions,
+        'board_bytes': board_bytes / boards,
+        'total_position_bytes': position_bytes,
+    }
+
+
+def random_game_positions(count, seed=0, memento=False):
+    '''Returns (manager, player to move) pairs for games played randomly from the start for a seeded number of
+    turns, each stopped on a turn where the player to move can still play'''
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        random.seed(rng.getrandbits(32))
+        manager = GameManager('random', 'random', memento)
+        for _ in range(rng.randrange(0, 16)):
+            player = manager.alternate_player()
+            if manager.get_winner(player) is not None:
+                break
+            worker, move_dir, build_dir = RandomTurn(manager.get_board(), player, manager).select_move()
+            player.move(worker, move_dir)
+            player.build(worker, build_dir)
+            manager.increment_turn_count()
+        player = manager.alternate_player()
+        if manager.get_winner(player) is None:
+            positions.append((manager, player))
+    return positions
+
+
+def _time(operation, items, repeat):
+    '''Calls operation on every item, repeat times, and returns the best nanoseconds per call'''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for item in items:
+            operation(item)
+        elapsed = (time.perf_counter_ns() - start) / len(items)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _uncached(operation):
+    '''Wraps a (worker, board) operation so that it runs with the worker's cached legal moves dropped'''
+    def run(item):
+        worker, board = item
+        board.invalidate_moves(worker.name)
+        return operation(worker, board)
+    return run
+
+
+def _undo_redo(manager):
+    '''Undoes and redoes the last turn of a game with memento on'''
+    manager.undo()
+    manager.redo()
+
+
+def _heuristic_move(position):
+    manager, player = position
+    return HeuristicTurn(manager.get_board(), player, manager).get_best_move_data()
+
+
+def run_suite(positions=300, repeat=5, games=30, seed=0):
+    '''Runs every benchmark on seeded positions and returns {benchmark name: nanoseconds per operation}'''
+    samples = random_game_positions(positions, seed)
+    memento_samples = [manager for manager, _ in random_game_positions(positions, seed, memento=True)
+                       if manager.get_turncount() > 1]
+    workers = [(worker, manager.get_board()) for manager, player in samples for worker in player.get_workers()]
+    random.seed(seed)
+
+    results = {
+        'worker_enumerate_moves': _time(_uncached(lambda worker, board: worker.enumerate_moves(board)), workers,
+                                        repeat),
+        'worker_enumerate_moves_cached': _time(lambda item: item[0].enumerate_moves(item[1]), workers, repeat),
+        'worker_no_moves_left': _time(lambda item: item[0].no_moves_left(item[1]), workers, repeat),
+        'board_win_condition_satisfied': _time(lambda item: item[0].get_board().win_condition_satisfied(),
+                                               samples, repeat),
+        'player_workers_cant_move': _time(lambda item: item[1].workers_cant_move(), samples, repeat),
+        'heuristic_get_best_move_data': _time(_heuristic_move, samples, repeat),
+        'manager_get_curr_move_data': _time(lambda item: item[0].get_curr_move_data(item[1]), samples, repeat),
+        'memento_undo_redo': _time(_undo_redo, memento_samples, repeat),
+    }
+
+    # Rules engine throughput, per leaf position counted by perft from the start
+    start_state = GameState('random', 'random', False, False, None)
+    results['perft_depth_3_per_node'] = _time(lambda game: perft(game, 3), [start_state], repeat) / perft(start_state, 3)
+
+    # Whole games are slow enough to time once each
+    game_seeds = list(range(seed, seed + games))
+    results['game_random_vs_heuristic'] = _time(lambda game_seed: play_game('random', 'heuristic', game_seed),
+                                                game_seeds, 1)
+    return results
+
+
+def save_baseline(path, results):
+    '''Writes benchmark results to a JSON baseline file'''
+    with open(path, 'w') as file:
+        json.dump({'python': platform.python_version(), 'ns_per_op': results}, file, indent=2, sort_keys=True)
+
+
+def compare(baseline_path, results, threshold):
+    '''Returns a list of (name, baseline ns, current ns, ratio) for every benchmark that is slower than
+    the baseline by more than the threshold fraction'''
+    with open(baseline_path) as file:
+        baseline = json.load(file)['ns_per_op']
+    regressions = []
+    for name, current in results.items():
+        if name in baseline and current > baseline[name] * (1 + threshold):
+            regressions.append((name, baseline[name], current, current / baseline[name]))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time the game's hot paths on seeded, reproducible positions")
+    parser.add_argument('--save', metavar='FILE', help="write the results to a JSON baseline")
+    parser.add_argument('--compare', metavar='FILE', help="compare the results against a JSON baseline")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="slowdown fraction reported as a regression (default: 0.10)")
+    parser.add_argument('--positions', type=int, default=300, help="number of seeded positions")
+    parser.add_argument('--games', type=int, default=30, help="number of full games")
+    parser.add_argument('--memory', action='store_true',
+                        help="report the memory of one million Positions compared with Board objects instead")
+    parser.add_argument('--movegen', action='store_true',
+                        help="compare Worker.enumerate_moves with BitBoard.generate_moves instead")
+    args = parser.parse_args()
+
+    if args.movegen:
+        result = bench_move_generation()
+        print(f"Worker.enumerate_moves: {result['object_moves_per_sec']:,.0f} moves/s")
+        print(f"BitBoard.generate_moves: {result['bitboard_moves_per_sec']:,.0f} moves/s")
+        print(f"Worker.enumerate_moves (cached): {result['cached_moves_per_sec']:,.0f} moves/s")
+        print(f"Speedup: {result['speedup']:.2f}x")
+        sys.exit(0)
+
+    if args.memory:
+        result = bench_position_memory()
+        print(f"Position: {result['position_bytes']:,.0f} bytes/position")
+        print(f"Board: {result['board_bytes']:,.0f} bytes/position")
+        print(f"1,000,000 Positions: {result['total_position_bytes'] / 2 ** 20:,.1f} MiB")
+        sys.exit(0)
+
+    results = run_suite(args.positions, games=args.games)
+    for name, ns in results.items():
+        print(f"{name:32} {ns:>14,.0f} ns/op")
+
+    if args.save:
+        save_baseline(args.save, results)
+
+    if args.compare:
+        regressions = compare(args.compare, results, args.threshold)
+        for name, baseline_ns, current_ns, ratio in regressions:
+            print(f"REGRESSION {name}: {baseline_ns:,.0f} -> {current_ns:,.0f} ns/op ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}")
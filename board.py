@@ -1,9 +1,38 @@
 from cell import Cell
+from geometry import BOARD_SIZE, get_geometry
+from zobrist import HEIGHT_KEYS, WORKER_KEYS
+
+# Tables of the default board size, which the BitBoard is limited to. See geometry.Geometry
+_GEOMETRY = get_geometry(BOARD_SIZE)
+FULL_MASK = (1 << (BOARD_SIZE * BOARD_SIZE)) - 1
+
+# NEIGHBORS[square] -> ((direction, square), ...) and NEIGHBOR_MASKS[square] -> bitmask of those squares,
+# where square = x * BOARD_SIZE + y
+NEIGHBORS = _GEOMETRY.neighbors
+NEIGHBOR_MASKS = _GEOMETRY.neighbor_masks
+
+# SQUARE_DIRECTION[square][neighbor square] -> direction from square to that neighbor
+SQUARE_DIRECTION = _GEOMETRY.square_direction
+
+# RING_BY_SQUARE[square] -> ring level and DISTANCE[square][square] -> Chebyshev distance
+RING_BY_SQUARE = _GEOMETRY.ring_by_square
+DISTANCE = _GEOMETRY.distance
+
 
 class Board:
-    '''Represents the Santorini board, a 5x5 grid of cells'''
-    def __init__(self):
-        self._cells = [[Cell(x, y) for y in range(5)] for x in range(5)]
+    '''Represents the Santorini board, a size x size grid of cells (5x5 by default)'''
+    def __init__(self, size=BOARD_SIZE):
+        self.size = size
+        self.geometry = get_geometry(size)
+        self._cells = [[Cell(x, y) for y in range(size)] for x in range(size)]
+        # Derived state kept up to date by every worker placement, move and build, so that
+        # game-end checks never rescan the board
+        self._worker_squares = {}
+        self._mobility = {}
+        self._workers_on_level3 = 0
+        # Legal moves of each placed worker, computed on first query and dropped when a square within
+        # distance 2 of the worker (its moves and their builds) changes
+        self._legal_moves = {}
     
     def get_specific_cell(self, x, y):
         '''Returns the cell at the specified x, y coordinate'''
@@ -13,29 +42,252 @@ class Board:
         '''Sets a given worker name at the cells of the given x, y coordinate'''
         cell = self.get_specific_cell(x, y)
         cell.occupy(worker_name)
+        self._worker_squares[worker_name] = x * self.size + y
+        if cell.get_height() == 3:
+            self._workers_on_level3 += 1
+        self._update_neighborhood(x * self.size + y)
+
+    def move_worker(self, worker_name, x, y):
+        '''Moves a placed worker to the given x, y coordinate'''
+        from_square = self._worker_squares[worker_name]
+        from_cell = self._cells[from_square // self.size][from_square % self.size]
+        to_cell = self._cells[x][y]
+        from_cell.remove()
+        to_cell.occupy(worker_name)
+        self._worker_squares[worker_name] = x * self.size + y
+        self._workers_on_level3 += (to_cell.get_height() == 3) - (from_cell.get_height() == 3)
+        self._update_neighborhood(from_square, x * self.size + y)
+
+    def build(self, x, y):
+        '''Builds one level at the given x, y coordinate'''
+        self._cells[x][y].build()
+        self._update_neighborhood(x * self.size + y)
+
+    def unbuild(self, x, y):
+        '''Removes one level at the given x, y coordinate'''
+        self._cells[x][y].unbuild()
+        self._update_neighborhood(x * self.size + y)
+
+    def restore(self, heights, worker_squares):
+        '''Sets every cell's height from heights[x][y] and places every worker from {name: (x, y)},
+        then recomputes the derived state from scratch'''
+        for x in range(self.size):
+            for y in range(self.size):
+                cell = self._cells[x][y]
+                while cell.get_height() < heights[x][y]:
+                    cell.build()
+                while cell.get_height() > heights[x][y]:
+                    cell.unbuild()
+                cell.remove()
+        self._worker_squares = {}
+        self._mobility = {}
+        self._workers_on_level3 = 0
+        self._legal_moves = {}
+        for worker_name, (x, y) in worker_squares.items():
+            self.set_worker_at_cell(worker_name, x, y)
+
+    def _count_moves(self, square):
+        '''Counts the cells the worker standing on the square can move to'''
+        x, y = divmod(square, self.size)
+        curr_cell = self._cells[x][y]
+        return sum(1 for _, new_x, new_y in self.geometry.adjacent[x][y] if self._cells[new_x][new_y].is_valid_move(curr_cell))
+
+    def _update_neighborhood(self, *squares):
+        '''Recounts the moves of every worker on or next to squares whose height or occupant changed, and drops
+        the cached legal moves of every worker within distance 2 of them, as only those squares decide where
+        a worker can move and build'''
+        distances = self.geometry.distance
+        for worker_name, worker_square in self._worker_squares.items():
+            distance = min(distances[worker_square][square] for square in squares)
+            if distance <= 1:
+                self._mobility[worker_name] = self._count_moves(worker_square)
+            if distance <= 2:
+                self._legal_moves.pop(worker_name, None)
+
+    def get_mobility(self, worker_name):
+        '''Returns the number of cells the worker can move to'''
+        return self._mobility[worker_name]
+
+    def get_legal_moves(self, worker_name, x, y):
+        '''Returns {move direction: [build directions]} of the worker standing on x, y, as computed by
+        Worker.enumerate_moves. Cached while nothing within distance 2 changes; the dict must not be modified'''
+        if self._worker_squares.get(worker_name) != x * self.size + y:
+            # Not a worker placed on this board, so there is nothing to cache
+            return self.compute_legal_moves(x, y)
+        moves = self._legal_moves.get(worker_name)
+        if moves is None:
+            moves = self._legal_moves[worker_name] = self.compute_legal_moves(x, y)
+        return moves
+
+    def invalidate_moves(self, worker_name):
+        '''Drops the cached legal moves of a worker, so that the next query computes them again'''
+        self._legal_moves.pop(worker_name, None)
+
+    def compute_legal_moves(self, x, y):
+        '''Computes {move direction: [build directions]} of a worker standing on x, y directly, without reading
+        or filling the cache'''
+        available_move_and_builds = {}
+        adjacent = self.geometry.adjacent
+        cells = self._cells
+        curr_cell = cells[x][y]
+        # Iterate through every in-bound move direction
+        for move_dir, move_x, move_y in adjacent[x][y]:
+            if cells[move_x][move_y].is_valid_move(curr_cell):
+                # Append all possible in-bound builds after move has been performed to the move direction key
+                available_move_and_builds[move_dir] = [
+                    build_dir for build_dir, build_x, build_y in adjacent[move_x][move_y]
+                    if cells[build_x][build_y].is_valid_build(x, y)
+                ]
+        return available_move_and_builds
     
     def in_bounds(self, x, y):
         '''Returns True if the given x, y coordinates are in bound with the board'''
-        return 5 > x >= 0 and 5 > y >= 0
+        return self.size > x >= 0 and self.size > y >= 0
     
     def win_condition_satisfied(self):
         '''Returns True if there is a worker on a cell of height 3'''
-        for row in self._cells:
-            for cell in row:
-                if cell.get_height() == 3 and cell.is_occupied():
-                    return True
-        return False
+        return self._workers_on_level3 > 0
     
     def __str__(self):
-        string = ""
+        separator = "+--" * self.size + "+"
+        lines = []
         for row in self._cells:
-            string += "+--+--+--+--+--+\n"
-            row_string = ""
-            for cell in row:
+            lines.append(separator)
+            lines.append("".join(
+                f"|{cell.get_height()}{cell.get_occupying_worker()}" if cell.is_occupied() else f"|{cell.get_height()} "
+                for cell in row
+            ) + "|")
+        lines.append(separator)
+        return "\n".join(lines)
+
+
+class BitBoard:
+    '''Alternative board representation using integer bitmasks.
+    Keeps one mask per building height (0-4), an occupancy mask, the square of each worker
+    and the Zobrist key of the heights and worker squares. Only represents the default 5x5 board'''
+    def __init__(self):
+        self.levels = [FULL_MASK, 0, 0, 0, 0]
+        self.heights = bytearray(BOARD_SIZE * BOARD_SIZE)
+        self.occupied = 0
+        self.workers = {}
+        self.key = 0
+
+    @classmethod
+    def from_board(cls, board):
+        '''Creates a bitboard holding the same heights and workers as the given Board'''
+        if board.size != BOARD_SIZE:
+            raise ValueError(f"BitBoard only represents {BOARD_SIZE}x{BOARD_SIZE} boards")
+        bitboard = cls()
+        for x in range(BOARD_SIZE):
+            for y in range(BOARD_SIZE):
+                cell = board.get_specific_cell(x, y)
+                square = x * BOARD_SIZE + y
+                for _ in range(cell.get_height()):
+                    bitboard.build(square)
                 if cell.is_occupied():
-                    row_string += f"|{cell.get_height()}{cell.get_occupying_worker()}"
-                else:
-                    row_string += f"|{cell.get_height()} "
-            string += row_string + "|\n"
-        string += "+--+--+--+--+--+"
-        return string
\ No newline at end of file
+                    bitboard.place_worker(cell.get_occupying_worker(), square)
+        return bitboard
+
+    def copy(self):
+        '''Returns an independent copy of this bitboard'''
+        bitboard = BitBoard.__new__(BitBoard)
+        bitboard.levels = list(self.levels)
+        bitboard.heights = bytearray(self.heights)
+        bitboard.occupied = self.occupied
+        bitboard.workers = dict(self.workers)
+        bitboard.key = self.key
+        return bitboard
+
+    def place_worker(self, worker_name, square):
+        '''Places a worker on the given square'''
+        self.workers[worker_name] = square
+        self.occupied |= 1 << square
+        self.key ^= WORKER_KEYS[worker_name][square]
+
+    def move_worker(self, worker_name, square):
+        '''Moves a worker from its current square to the given square'''
+        from_square = self.workers[worker_name]
+        self.occupied ^= (1 << from_square) | (1 << square)
+        self.key ^= WORKER_KEYS[worker_name][from_square] ^ WORKER_KEYS[worker_name][square]
+        self.workers[worker_name] = square
+
+    def build(self, square):
+        '''Raises the building on the given square by one level'''
+        height = self.heights[square]
+        bit = 1 << square
+        self.levels[height] ^= bit
+        self.levels[height + 1] |= bit
+        self.heights[square] = height + 1
+        self.key ^= HEIGHT_KEYS[square][height] ^ HEIGHT_KEYS[square][height + 1]
+
+    def unbuild(self, square):
+        '''Lowers the building on the given square by one level'''
+        height = self.heights[square]
+        bit = 1 << square
+        self.levels[height] ^= bit
+        self.levels[height - 1] |= bit
+        self.heights[square] = height - 1
+        self.key ^= HEIGHT_KEYS[square][height] ^ HEIGHT_KEYS[square][height - 1]
+
+    def apply(self, worker_name, move_square, build_square):
+        '''Moves a worker and builds in place. Returns the square the worker left, which undo needs'''
+        from_square = self.workers[worker_name]
+        self.move_worker(worker_name, move_square)
+        self.build(build_square)
+        return from_square
+
+    def undo(self, worker_name, from_square, build_square):
+        '''Reverts an apply, restoring the board exactly'''
+        self.unbuild(build_square)
+        self.move_worker(worker_name, from_square)
+
+    def _climbable(self, height):
+        '''Returns the mask of squares a worker standing at the given height could climb to'''
+        levels = self.levels
+        mask = levels[0] | levels[1]
+        if height >= 1:
+            mask |= levels[2]
+        if height >= 2:
+            mask |= levels[3]
+        return mask
+
+    def can_move(self, worker_name):
+        '''Returns True if the worker has at least one legal move'''
+        square = self.workers[worker_name]
+        return bool(NEIGHBOR_MASKS[square] & ~self.occupied & self._climbable(self.heights[square]))
+
+    def generate_moves(self, worker_names):
+        '''Yields every legal (worker, move direction, build direction) triple for the given workers,
+        in the same order as Worker.enumerate_moves'''
+        occupied = self.occupied
+        dome = self.levels[4]
+        for worker_name in worker_names:
+            square = self.workers[worker_name]
+            targets = NEIGHBOR_MASKS[square] & ~occupied & self._climbable(self.heights[square])
+            if not targets:
+                continue
+            # The square being left becomes free to build on
+            buildable = ~(occupied ^ (1 << square)) & ~dome
+            for move_dir, move_square in NEIGHBORS[square]:
+                if targets >> move_square & 1:
+                    builds = NEIGHBOR_MASKS[move_square] & buildable
+                    for build_dir, build_square in NEIGHBORS[move_square]:
+                        if builds >> build_square & 1:
+                            yield worker_name, move_dir, build_dir
+
+    def generate_actions(self, worker_names):
+        '''Yields every legal (worker, move square, build square) triple for the given workers'''
+        occupied = self.occupied
+        dome = self.levels[4]
+        for worker_name in worker_names:
+            square = self.workers[worker_name]
+            targets = NEIGHBOR_MASKS[square] & ~occupied & self._climbable(self.heights[square])
+            if not targets:
+                continue
+            buildable = ~(occupied ^ (1 << square)) & ~dome
+            for _, move_square in NEIGHBORS[square]:
+                if targets >> move_square & 1:
+                    builds = NEIGHBOR_MASKS[move_square] & buildable
+                    for _, build_square in NEIGHBORS[move_square]:
+                        if builds >> build_square & 1:
+                            yield worker_name, move_square, build_square
@@ -0,0 +1,52 @@
+import mmap
+import struct
+
+# A book file starts with MAGIC, a format version, the last turn any entry is played on and the number of entries,
+# followed by entries sorted by position key. Each entry is the Zobrist hash of a canonical position
+# (see symmetry.canonicalize) and the action byte to play there, in the canonical position's orientation
+MAGIC = b'SBOK'
+VERSION = 3
+BOOK_HEADER = struct.Struct('<4sBHI')
+BOOK_ENTRY = struct.Struct('<QB')
+
+
+class OpeningBook:
+    '''Read-only, memory-mapped opening book. Looks up the action to play in a canonical position by its hash.
+    last_turn is the last turn the book has a move for, so players can stop looking once the game is past it'''
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.last_turn, self._size = BOOK_HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+
+    def __len__(self):
+        return self._size
+
+    def lookup(self, key):
+        '''Returns the action byte stored for the canonical position hash, or None'''
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, action = BOOK_ENTRY.unpack_from(self._data, BOOK_HEADER.size + middle * BOOK_ENTRY.size)
+            if entry_key == key:
+                return action
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def close(self):
+        '''Closes the book file'''
+        self._data.close()
+        self._file.close()
+
+
+def write_book(path, entries, last_turn):
+    '''Writes {canonical position hash: canonical action byte} to a book file, along with the last turn
+    any of the positions is reached on'''
+    with open(path, 'wb') as file:
+        file.write(BOOK_HEADER.pack(MAGIC, VERSION, last_turn, len(entries)))
+        for key in sorted(entries):
+            file.write(BOOK_ENTRY.pack(key, entries[key]))
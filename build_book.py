@@ -0,0 +1,127 @@
+import argparse
+from board import BitBoard, SQUARE_DIRECTION
+from book import write_book
+from game import GameManager
+from player import BOARD_SIZE, encode_action
+from position import Position
+from record import read_records
+from search import AlphaBetaSearch
+from simulate import simulate
+from symmetry import canonicalize_position, to_canonical_action
+from zobrist import hash_position
+
+
+def _canonical_key(manager):
+    '''Returns (hash of the canonical position, the position, transform into the canonical position) of a game'''
+    position = Position.from_game_state(manager)
+    canonical, transform = canonicalize_position(position)
+    return hash_position(canonical), position, transform
+
+
+def _opening_positions(records, plies):
+    '''Replays the first plies of every game record. Returns {canonical position hash: {canonical action:
+    [games, wins]}}, where wins counts the games won by the side that played the action, so symmetric positions
+    and moves share their counts, and {canonical position hash: (game record, turn)} reaching each position'''
+    statistics = {}
+    positions = {}
+    for record in records:
+        manager = GameManager(record.playerWhite_type, record.playerBlue_type)
+        for turn, (worker_name, move_dir, build_dir) in enumerate(record.turns()):
+            if turn >= plies:
+                break
+            player = manager.alternate_player()
+            key, position, transform = _canonical_key(manager)
+            action = to_canonical_action(position, transform, record.actions[turn])
+            counts = statistics.setdefault(key, {}).setdefault(action, [0, 0])
+            counts[0] += 1
+            if record.winner == player.color:
+                counts[1] += 1
+            positions.setdefault(key, (record, turn))
+
+            worker = player.select_worker(worker_name)
+            player.move(worker, move_dir)
+            player.build(worker, build_dir)
+            manager.increment_turn_count()
+    return statistics, positions
+
+
+def _replay(record, turns):
+    '''Returns a GameManager holding the position after the first turns of a game record'''
+    manager = GameManager(record.playerWhite_type, record.playerBlue_type)
+    for turn, (worker_name, move_dir, build_dir) in enumerate(record.turns()):
+        if turn >= turns:
+            break
+        player = manager.alternate_player()
+        worker = player.select_worker(worker_name)
+        player.move(worker, move_dir)
+        player.build(worker, build_dir)
+        manager.increment_turn_count()
+    return manager
+
+
+def build_book(records, plies=8, min_games=20, search_budget=None):
+    '''Builds {canonical position hash: canonical action byte} for positions reached in the first plies of at least
+    min_games games. Picks the action with the best win rate among those played at least min_games // 4 times, or, if a
+    search budget in seconds is given, the action found by an alpha-beta search of that length.
+    Returns the entries and the last turn any of their positions is reached on'''
+    statistics, positions = _opening_positions(records, plies)
+    entries = {}
+    for key, actions in statistics.items():
+        if sum(games for games, _ in actions.values()) < min_games:
+            continue
+        if search_budget is None:
+            candidates = {action: wins / games for action, (games, wins) in actions.items()
+                          if games >= max(1, min_games // 4)}
+            if candidates:
+                entries[key] = max(candidates, key=candidates.get)
+            continue
+
+        record, turn = positions[key]
+        manager = _replay(record, turn)
+        player = manager.alternate_player()
+        players = manager.get_both_players()
+        opponent = players[1] if players[0] is player else players[0]
+        workers = player.get_workers()
+        search = AlphaBetaSearch(BitBoard.from_board(manager.get_board()),
+                                 [worker.name for worker in workers],
+                                 [worker.name for worker in opponent.get_workers()],
+                                 search_budget, table=manager.get_transposition_table(player),
+                                 blue_to_move=player.color == 'blue')
+        worker_name, move_square, build_square = search.search()
+        worker = player.select_worker(worker_name)
+        from_square = worker.x * BOARD_SIZE + worker.y
+        action = encode_action(workers.index(worker), SQUARE_DIRECTION[from_square][move_square],
+                               SQUARE_DIRECTION[move_square][build_square])
+        _, position, transform = _canonical_key(manager)
+        entries[key] = to_canonical_action(position, transform, action)
+    # A position's turn is fixed by its number of buildings, so the first game reaching it gives its turn
+    last_turn = max((positions[key][1] + 1 for key in entries), default=0)
+    return entries, last_turn
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build an opening book from self-play games")
+    parser.add_argument('book', help="book file to write")
+    parser.add_argument('--records', nargs='+', metavar='FILE',
+                        help="build from existing game record files instead of playing new games")
+    parser.add_argument('--player', default='heuristic', help="player type used for self-play")
+    parser.add_argument('-n', '--games', type=int, default=20000, help="number of self-play games")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="number of processes for self-play")
+    parser.add_argument('--plies', type=int, default=8, help="number of opening turns to cover")
+    parser.add_argument('--min-games', type=int, default=20, help="games a position must appear in")
+    parser.add_argument('--search', type=float, default=None, metavar='SECONDS',
+                        help="pick book moves with an alpha-beta search of this many seconds per position")
+    args = parser.parse_args()
+
+    record_paths = args.records
+    if record_paths is None:
+        record_paths = [args.book + '.selfplay']
+        simulate(args.player, args.player, args.games, args.jobs, record_path=record_paths[0])
+
+    def all_records():
+        for record_path in record_paths:
+            yield from read_records(record_path)
+
+    entries, last_turn = build_book(all_records(), args.plies, args.min_games, args.search)
+    write_book(args.book, entries, last_turn)
+    print(f"Wrote {len(entries)} positions to {args.book}")
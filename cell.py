@@ -1,5 +1,7 @@
 class Cell:
-    """Represents each individual cell within the 5x5 board."""
+    """Represents each individual cell within the board."""
+    __slots__ = ('_x', '_y', '_height', '_occupied_by')
+
     def __init__(self, x, y):
         self._x = x
         self._y = y
@@ -10,6 +12,10 @@ class Cell:
         '''Increments the height of the cell's building'''
         self._height += 1
 
+    def unbuild(self):
+        '''Decrements the height of the cell's building'''
+        self._height -= 1
+
     def get_height(self):
         '''Returns the height of the cell's building'''
         return self._height
@@ -1,4 +1,6 @@
-from turn import HumanTurn, RandomTurn, HeuristicTurn
+import json
+import sys
+from turn import TURNS, COMPUTER_TURNS
 
 class SantoriniCLI:
     '''Displays read-eval-loop CLI'''
@@ -6,29 +8,31 @@ class SantoriniCLI:
         self._manager = manager
 
     def run(self):
-        '''Displays the CLI loop'''
+        '''Displays the CLI loop until the game ends. Returns the color of the winner'''
+        profiler = self._manager.get_profiler()
         while True:
-            print(self._manager.get_board())
+            with profiler.phase('render_board'):
+                print(self._manager.get_board())
 
             # Alternate worker for each turn and display info
             player = self._manager.alternate_player()
             self.display_turn_info(player)
 
             # Check if game has ended
-            self._manager.check_game_end(player)
+            with profiler.phase('check_game_end'):
+                winner = self._manager.check_game_end(player)
+            if winner is not None:
+                return winner
 
             # Prompt for memento's undo/redo (if applicable)
-            action = self._manager.memento()
+            with profiler.phase('memento_prompt'):
+                action = self._manager.memento()
             if action == 'redo' or action == 'undo' or action == 0:
                 continue
             
             # Run corresponding player type's turn
-            if player.type == 'human':
-                HumanTurn(self._manager.get_board(), player, self._manager).run()
-            elif player.type == 'random':
-                RandomTurn(self._manager.get_board(), player, self._manager).run()
-            elif player.type == 'heuristic':
-                HeuristicTurn(self._manager.get_board(), player, self._manager).run()
+            with profiler.phase('turn_' + player.type):
+                TURNS[player.type](self._manager.get_board(), player, self._manager).run()
 
             self._manager.increment_turn_count()
 
@@ -42,4 +46,57 @@ class SantoriniCLI:
 
     def display_winner(self, winner):
         '''Displays the winner'''
-        print(f'{winner} has won')
\ No newline at end of file
+        print(f'{winner} has won')
+
+
+class JSONLinesCLI:
+    '''Plays one game between computer players without prompts or board rendering, writing one compact
+    JSON object per turn and one for the winner. Lines are buffered and written buffer_size at a time'''
+    def __init__(self, manager, stream=None, buffer_size=64):
+        self._manager = manager
+        self._stream = stream if stream is not None else sys.stdout
+        self._buffer_size = buffer_size
+        self._buffer = []
+
+    def run(self):
+        '''Plays the game to its end. Returns the color of the winner'''
+        profiler = self._manager.get_profiler()
+        while True:
+            player = self._manager.alternate_player()
+
+            with profiler.phase('check_game_end'):
+                winner = self._manager.get_winner(player)
+            if winner is not None:
+                self.display_winner(winner)
+                if profiler.enabled():
+                    print(profiler.summary(), file=sys.stderr)
+                return winner
+
+            with profiler.phase('turn_' + player.type):
+                turn = COMPUTER_TURNS[player.type](self._manager.get_board(), player, self._manager)
+                worker, move_dir, build_dir = turn.select_move()
+                player.move(worker, move_dir)
+                player.build(worker, build_dir)
+
+            data = self._manager.get_curr_move_data(player)
+            self._emit({'turn': self._manager.get_turncount(), 'player': player.color, 'worker': worker.name,
+                        'move': move_dir, 'build': build_dir, 'scores': data, 'winner': None})
+            self._manager.increment_turn_count()
+
+    def display_winner(self, winner):
+        '''Writes the winner and flushes every buffered line'''
+        player = self._manager.alternate_player()
+        self._emit({'turn': self._manager.get_turncount(), 'player': player.color, 'winner': winner})
+        self.flush()
+
+    def flush(self):
+        '''Writes the buffered lines to the stream'''
+        if self._buffer:
+            self._stream.write(''.join(self._buffer))
+            self._buffer.clear()
+        self._stream.flush()
+
+    def _emit(self, event):
+        self._buffer.append(json.dumps(event, separators=(',', ':')) + '\n')
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
@@ -11,6 +11,14 @@ class Command(ABC):
     def execute(self):
         pass
 
+    def get_worker(self):
+        '''Returns the worker the command acts on'''
+        return self._worker
+
+    def get_direction(self):
+        '''Returns the direction the command acts in'''
+        return self._direction
+
 class MoveCommand(Command):
     '''Concrete command for move'''
     def execute(self):
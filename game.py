@@ -1,25 +1,37 @@
 from board import Board
-from player import PlayerWhite, PlayerBlue, DIRECTION
+from player import PlayerWhite, PlayerBlue, DIRECTION, BOARD_SIZE, encode_action, decode_action, starting_positions
 from observer import Subject, EndGameObserver
 from memento import Originator, CareTaker
-from cli import SantoriniCLI
+from cli import SantoriniCLI, JSONLinesCLI
+from zobrist import SIDE_KEY, TranspositionTable, get_keys, hash_board
+from profiler import NullProfiler
 
 class GameManager(Subject):
     '''Manages and modifies the game state. Also keeps track of the game state history'''
-    def __init__(self, playerWhite_type='human', playerBlue_type='human', memento=False, score_display=False):
+    def __init__(self, playerWhite_type='human', playerBlue_type='human', memento=False, score_display=False,
+                 journal=None, opening_book=None, profiler=None, json_output=False,
+                 white_weights=None, blue_weights=None, size=BOARD_SIZE, move_budget=None):
         super().__init__()
-        self._cli = SantoriniCLI(self)
+        self._cli = JSONLinesCLI(self) if json_output else SantoriniCLI(self)
         self._game_observer = EndGameObserver()
         self.attach(self._game_observer)
-        self._game = GameState(playerWhite_type, playerBlue_type, memento, score_display, self)
+        self._game = GameState(playerWhite_type, playerBlue_type, memento, score_display, self,
+                               white_weights, blue_weights, size)
         self._memento = memento
+        self._transposition_tables = {}
+        self._journal = journal
+        self._opening_book = opening_book
+        self._profiler = profiler if profiler is not None else NullProfiler()
+        self._move_budget = move_budget
+        if journal is not None:
+            journal.start(self._game)
         if memento:
-            self._originator = Originator(self)
+            self._originator = Originator(self._game)
             self._caretaker = CareTaker(self._originator)
 
     def run(self):
-        '''Run the CLI'''
-        self._cli.run()
+        '''Runs the CLI for one game. Returns the color of the winner'''
+        return self._cli.run()
 
     def alternate_player(self):
         '''Alternates player in this round'''
@@ -28,18 +40,42 @@ class GameManager(Subject):
         else:
             return self._game.get_blue()
         
-    def check_game_end(self, player):
-        '''Checks if the game has ended and notifies the observer which prompts for restart'''
+    def get_winner(self, player):
+        '''Returns the color of the winner if the game has ended before the given player's turn, else None'''
         if self._game.get_board().win_condition_satisfied() or player.workers_cant_move():
             if player.color == 'white':
-                winner = 'blue'
+                return 'blue'
             else:
-                winner = 'white'
+                return 'white'
+        return None
+
+    def check_game_end(self, player):
+        '''Checks if the game has ended. If so, displays the winner and notifies the observer, which prompts for
+        restart. Returns the color of the winner, or None if the game goes on'''
+        winner = self.get_winner(player)
+        if winner is not None:
             self._cli.display_winner(winner)
+            if self._profiler.enabled():
+                print(self._profiler.summary())
             self.notify("end")
+        return winner
+
+    def restart_requested(self):
+        '''Returns True if the players asked to play again when the last game ended'''
+        return self._game_observer.restart()
 
-        if self._game_observer.restart():
-            GameManager(self._game.get_white().type, self._game.get_blue().type, self._game.get_memento(), self._game.get_scoredisplay()).run()
+    def reset(self):
+        '''Sets the game back to the starting position for another game, reusing the board, players, observer and
+        undo history. Each game gets a fresh profiler of the same kind and empty transposition tables.
+        A journaled session starts a new journal file for the next game'''
+        self._game.reset()
+        if self._memento:
+            self._caretaker.clear()
+        for table in self._transposition_tables.values():
+            table.clear()
+        if self._journal is not None:
+            self._journal.next_game(self._game)
+        self._profiler = type(self._profiler)()
     
     def get_both_players(self):
         '''Returns both players'''
@@ -52,33 +88,42 @@ class GameManager(Subject):
         while True:
             action = input("undo, redo, or next\n")
             if action == 'undo':
-                if not self._caretaker.history_isempty():
-                    # Save the current state in case user wants to redo
-                    self._originator.change_state(self._game)
-                    self._caretaker.do_redo()
-                    # Restore the undo game state
-                    self._game = self._caretaker.undo()
+                if self.undo():
                     return action
                 return 0
             elif action == 'redo':
-                if not self._caretaker.undone_isempty():
-                    # Save the current state in case user wants to undo again
-                    self._originator.change_state(self._game)
-                    self._caretaker.do()
-                    # Restore the redo game state
-                    self._game = self._caretaker.redo()
+                if self.redo():
                     return action
                 return 0
             elif action == 'next':
-                # Save the current state
-                self._originator.change_state(self._game)
-                self._caretaker.do()
+                # The turn about to be played is recorded by move and build
                 self._caretaker.clear_undone()
                 break
 
+    def undo(self):
+        '''Reverts the last turn, keeping it in case user wants to redo. Returns False if there is nothing to undo'''
+        if self._caretaker.history_isempty():
+            return False
+        self._caretaker.undo()
+        self._checkpoint_journal()
+        return True
+
+    def redo(self):
+        '''Replays the last undone turn, keeping it in case user wants to undo again.
+        Returns False if there is nothing to redo'''
+        if self._caretaker.undone_isempty():
+            return False
+        self._caretaker.redo()
+        self._checkpoint_journal()
+        return True
+
     def get_board(self):
         '''Returns the board'''
         return self._game.get_board()
+
+    def get_game_state(self):
+        '''Returns the GameState this manager plays on, for action-code play with legal_actions, apply and undo'''
+        return self._game
     
     def get_turncount(self):
         '''Returns the turn count'''
@@ -98,9 +143,9 @@ class GameManager(Subject):
             new_cell = self._game.get_board().get_specific_cell(new_x, new_y)
             # Check if worker can move to new cell
             if new_cell.is_valid_move(curr_cell) and self._game.get_board().in_bounds(new_x, new_y):
-                curr_cell.remove()
-                new_cell.occupy(worker.name)
-                worker.update_pos(new_x, new_y)
+                if self._memento:
+                    self._originator.record_move(worker.name, (worker.x, worker.y), (new_x, new_y))
+                self._game.move_worker(worker, new_x, new_y)
             else:
                 raise Exception
         except:
@@ -115,19 +160,55 @@ class GameManager(Subject):
             new_cell = self._game.get_board().get_specific_cell(new_x, new_y)
             # Check if worker can build at new cell
             if new_cell.is_valid_build() and self._game.get_board().in_bounds(new_x, new_y):
-                new_cell.build()
+                self._game.build_at(new_x, new_y)
+                if self._memento:
+                    self._originator.record_build((new_x, new_y))
             else:
                 raise Exception
         except:
             raise Exception
         
     def increment_turn_count(self):
-        '''Increments the game's turn count'''
+        '''Increments the game's turn count, saving the turn just played to the undo history if memento is on'''
+        if self._memento and self._originator.has_recorded_turn():
+            self._caretaker.do()
         self._game.increment_turn_count()
+        if self._journal is not None:
+            self._journal.end_turn(self._game)
+
+    def _checkpoint_journal(self):
+        '''Writes a journal checkpoint of the current state, if the game is journaled'''
+        if self._journal is not None:
+            self._journal.checkpoint(self._game)
+
+    def get_hash(self):
+        '''Returns the Zobrist hash of the current position'''
+        return self._game.get_hash()
+
+    def get_opening_book(self):
+        '''Returns the opening book computer players consult, or None'''
+        return self._opening_book
+
+    def get_profiler(self):
+        '''Returns the profiler timing the phases of the game loop'''
+        return self._profiler
+
+    def get_move_budget(self):
+        '''Returns the seconds a computer turn may take to choose its move, or None if turns are not timed'''
+        return self._move_budget
+
+    def get_transposition_table(self, player):
+        '''Returns the transposition table of the given player's search, creating it on first use. Each player
+        has its own table, as scores stored by a search depend on the searching player's weights'''
+        if player.color not in self._transposition_tables:
+            self._transposition_tables[player.color] = TranspositionTable()
+        return self._transposition_tables[player.color]
 
     def execute_command(self, command):
-        """Execute a command."""
+        """Execute a command, appending it to the journal if the game is journaled."""
         command.execute()
+        if self._journal is not None:
+            self._journal.record_command(command, self._game.get_turncount())
     
     def _calculate_curr_height_score(self, player):
         '''Calculates current height score usign workers' current position'''
@@ -165,12 +246,16 @@ class GameManager(Subject):
         distance_AY = self._calculate_curr_distance(worker_A, worker_Y)
         distance_BZ = self._calculate_curr_distance(worker_B, worker_Z)
         if player.color == 'white':
-            return 8 - (min(distance_BY, distance_AY) + min(distance_BZ, distance_AZ))
+            return 2 * self._game.get_board().geometry.max_distance - (min(distance_BY, distance_AY) + min(distance_BZ, distance_AZ))
         elif player.color == 'blue':
-            return 8 - (min(distance_AZ, distance_AY) + min(distance_BY, distance_BZ))
+            return 2 * self._game.get_board().geometry.max_distance - (min(distance_AZ, distance_AY) + min(distance_BY, distance_BZ))
         
     def get_curr_move_data(self, player):
         '''Creates a tuple containing current height, center, distance score'''
+        with self._profiler.phase('get_curr_move_data'):
+            return self._get_curr_move_data(player)
+
+    def _get_curr_move_data(self, player):
         height_score = self._calculate_curr_height_score(player)
         center_score = self._calculate_curr_center_score(player)
         distance_score = self._calculate_curr_distance_score(player)
@@ -178,13 +263,17 @@ class GameManager(Subject):
 
 class GameState:
     '''Stores a state of a game including the board, players, turn count, and score display'''
-    def __init__(self, playerWhite_type, playerBlue_type, memento, score_display, manager):
-        self._board = Board()
-        self._playerWhite = PlayerWhite(self._board, playerWhite_type, manager)
-        self._playerBlue = PlayerBlue(self._board, playerBlue_type, manager)
+    def __init__(self, playerWhite_type, playerBlue_type, memento, score_display, manager, white_weights=None,
+                 blue_weights=None, size=BOARD_SIZE):
+        self._board = Board(size)
+        self._size = size
+        self._height_keys, self._worker_keys = get_keys(size)
+        self._playerWhite = PlayerWhite(self._board, playerWhite_type, manager, white_weights)
+        self._playerBlue = PlayerBlue(self._board, playerBlue_type, manager, blue_weights)
         self._turn_count = 1
         self._memento = memento
         self._score_display = score_display
+        self._hash = hash_board(self._board)
 
     def get_board(self):
         '''Returns the board'''
@@ -215,5 +304,88 @@ class GameState:
         return self._score_display
     
     def increment_turn_count(self):
-        '''Increments the game's turn count'''
-        self._turn_count += 1
\ No newline at end of file
+        '''Increments the game's turn count, handing the move to the other side'''
+        self._turn_count += 1
+        self._hash ^= SIDE_KEY
+
+    def decrement_turn_count(self):
+        '''Decrements the game's turn count, handing the move back to the other side'''
+        self._turn_count -= 1
+        self._hash ^= SIDE_KEY
+
+    def get_hash(self):
+        '''Returns the Zobrist hash of the heights, worker squares and side to move'''
+        return self._hash
+
+    def move_worker(self, worker, x, y):
+        '''Moves a worker to the given x, y coordinate and updates the hash'''
+        self._board.move_worker(worker.name, x, y)
+        self._hash ^= self._worker_keys[worker.name][worker.x * self._size + worker.y] \
+            ^ self._worker_keys[worker.name][x * self._size + y]
+        worker.update_pos(x, y)
+
+    def build_at(self, x, y):
+        '''Builds one level at the given x, y coordinate and updates the hash'''
+        height = self._board.get_specific_cell(x, y).get_height()
+        self._board.build(x, y)
+        square = x * self._size + y
+        self._hash ^= self._height_keys[square][height] ^ self._height_keys[square][height + 1]
+
+    def unbuild_at(self, x, y):
+        '''Removes one level at the given x, y coordinate and updates the hash'''
+        height = self._board.get_specific_cell(x, y).get_height()
+        self._board.unbuild(x, y)
+        square = x * self._size + y
+        self._hash ^= self._height_keys[square][height] ^ self._height_keys[square][height - 1]
+
+    def get_player_to_move(self):
+        '''Returns the player whose turn it is, white on odd turns and blue on even turns'''
+        if self._turn_count % 2 == 1:
+            return self._playerWhite
+        else:
+            return self._playerBlue
+
+    def legal_actions(self):
+        '''Returns the action code of every legal turn of the player to move, as encoded by player.encode_action'''
+        actions = []
+        for index, worker in enumerate(self.get_player_to_move().get_workers()):
+            for move_dir, builds in worker.enumerate_moves(self._board).items():
+                for build_dir in builds:
+                    actions.append(encode_action(index, move_dir, build_dir))
+        return actions
+
+    def apply(self, action):
+        '''Plays an action code for the player to move in place: moves the worker, builds and hands the move
+        to the other side. The action is not validated and must come from legal_actions'''
+        worker_index, move_dir, build_dir = decode_action(action)
+        worker = self.get_player_to_move().get_workers()[worker_index]
+        self.move_worker(worker, worker.x + DIRECTION[move_dir]['x'], worker.y + DIRECTION[move_dir]['y'])
+        self.build_at(worker.x + DIRECTION[build_dir]['x'], worker.y + DIRECTION[build_dir]['y'])
+        self.increment_turn_count()
+
+    def undo(self, action):
+        '''Takes back the action code played last by apply, restoring the board, worker, turn count and hash exactly'''
+        self.decrement_turn_count()
+        worker_index, move_dir, build_dir = decode_action(action)
+        worker = self.get_player_to_move().get_workers()[worker_index]
+        self.unbuild_at(worker.x + DIRECTION[build_dir]['x'], worker.y + DIRECTION[build_dir]['y'])
+        self.move_worker(worker, worker.x - DIRECTION[move_dir]['x'], worker.y - DIRECTION[move_dir]['y'])
+
+    def get_worker(self, name):
+        '''Returns the worker with the given name from either player'''
+        return self._playerWhite.select_worker(name) or self._playerBlue.select_worker(name)
+
+    def reset(self):
+        '''Returns to the starting position: no buildings, every worker on its starting square and turn 1'''
+        size = self._size
+        self.restore_position([[0] * size for _ in range(size)], starting_positions(size), 1)
+
+    def restore_position(self, heights, worker_positions, turn_count):
+        '''Sets every cell's height from heights[x][y], every worker's position from {name: (x, y)}
+        and the turn count, then recomputes the hash'''
+        for player in self.get_players():
+            for worker in player.get_workers():
+                worker.update_pos(*worker_positions[worker.name])
+        self._board.restore(heights, worker_positions)
+        self._turn_count = turn_count
+        self._hash = hash_board(self._board, turn_count % 2 == 0)
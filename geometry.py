@@ -0,0 +1,61 @@
+DIRECTION = {
+    'n': {'y': 0, 'x': -1},
+    'ne': {'y': 1, 'x': -1},
+    'e': {'y': 1, 'x': 0},
+    'se': {'y': 1, 'x': 1},
+    's': {'y': 0, 'x': 1},
+    'sw': {'y': -1, 'x': 1},
+    'w': {'y': -1, 'x': 0},
+    'nw': {'y': -1, 'x': -1},
+}
+
+# Default board size
+BOARD_SIZE = 5
+
+
+class Geometry:
+    '''Lookup tables of one board size. Computed once per size by get_geometry and shared by every board of that size'''
+    def __init__(self, size):
+        self.size = size
+        # Largest Chebyshev distance between two squares
+        self.max_distance = size - 1
+        # adjacent[x][y] -> ((direction, x, y), ...) for every in-bound neighbor of x, y, in DIRECTION order
+        self.adjacent = tuple(
+            tuple(
+                tuple((dir, x + DIRECTION[dir]['x'], y + DIRECTION[dir]['y']) for dir in DIRECTION
+                      if size > x + DIRECTION[dir]['x'] >= 0 and size > y + DIRECTION[dir]['y'] >= 0)
+                for y in range(size)
+            )
+            for x in range(size)
+        )
+        # ring_levels[x][y] -> 0 for the outer ring, up to (size - 1) // 2 for the center
+        self.ring_levels = tuple(
+            tuple(min(x, y, size - 1 - x, size - 1 - y) for y in range(size)) for x in range(size)
+        )
+
+        # The same tables indexed by square = x * size + y
+        # neighbors[square] -> ((direction, square), ...) and neighbor_masks[square] -> bitmask of those squares
+        self.neighbors = tuple(
+            tuple((dir, new_x * size + new_y) for dir, new_x, new_y in self.adjacent[x][y])
+            for x in range(size) for y in range(size)
+        )
+        self.neighbor_masks = tuple(sum(1 << square for _, square in neighbors) for neighbors in self.neighbors)
+        # square_direction[square][neighbor square] -> direction from square to that neighbor
+        self.square_direction = tuple({square: dir for dir, square in neighbors} for neighbors in self.neighbors)
+        self.ring_by_square = tuple(self.ring_levels[x][y] for x in range(size) for y in range(size))
+        # distance[square][square] -> Chebyshev distance
+        self.distance = tuple(
+            tuple(max(abs(x1 - x2), abs(y1 - y2)) for x2 in range(size) for y2 in range(size))
+            for x1 in range(size) for y1 in range(size)
+        )
+
+
+# Geometry of every board size in use, by size
+_geometries = {}
+
+
+def get_geometry(size=BOARD_SIZE):
+    '''Returns the shared Geometry of the given board size'''
+    if size not in _geometries:
+        _geometries[size] = Geometry(size)
+    return _geometries[size]
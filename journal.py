@@ -0,0 +1,147 @@
+import json
+import sys
+from command import MoveCommand, BuildCommand
+from geometry import DIRECTION, BOARD_SIZE
+from game import GameState
+
+
+class GameJournal:
+    '''Append-only journal of the move and build commands executed in one game, one JSON object per line.
+    Every interval turns it also writes a checkpoint of the full position, and records the byte offset of
+    each checkpoint in an index file next to the journal so load_state can seek straight to it.
+    Later games of a session are journaled to the path with the game number appended: FILE.2, FILE.3 and so on'''
+    def __init__(self, path, interval=10):
+        self._path = path
+        self._interval = interval
+        self._games = 1
+        self._open(path)
+
+    def _open(self, path):
+        self._file = open(path, 'wb')
+        self._index = open(path + '.idx', 'w')
+
+    def game_path(self, number):
+        '''Returns the path of the journal of the given game of the session, counting from 1'''
+        return self._path if number == 1 else f"{self._path}.{number}"
+
+    def next_game(self, game):
+        '''Closes the current game's journal and starts the next game's'''
+        self.close()
+        self._games += 1
+        self._open(self.game_path(self._games))
+        self.start(game)
+
+    def start(self, game):
+        '''Writes the header and the checkpoint of the starting position'''
+        self._write({'type': 'header',
+                     'white': game.get_white().type,
+                     'blue': game.get_blue().type,
+                     'size': game.get_board().size,
+                     'interval': self._interval})
+        self.checkpoint(game)
+
+    def record_command(self, command, turn):
+        '''Appends an executed move or build command'''
+        if isinstance(command, MoveCommand):
+            kind = 'move'
+        elif isinstance(command, BuildCommand):
+            kind = 'build'
+        else:
+            return
+        self._write({'type': kind, 'turn': turn,
+                     'worker': command.get_worker().name, 'dir': command.get_direction()})
+
+    def end_turn(self, game):
+        '''Writes a checkpoint if the new turn falls on the interval, and flushes the journal'''
+        if (game.get_turncount() - 1) % self._interval == 0:
+            self.checkpoint(game)
+        else:
+            self._file.flush()
+
+    def checkpoint(self, game):
+        '''Writes a compact full-state checkpoint of the game and indexes its offset.
+        Also called after undo/redo so that replays follow the line actually played'''
+        board = game.get_board()
+        heights = ''.join(str(board.get_specific_cell(x, y).get_height())
+                          for x in range(board.size) for y in range(board.size))
+        workers = {}
+        for player in game.get_players():
+            for worker in player.get_workers():
+                workers[worker.name] = [worker.x, worker.y]
+        offset = self._file.tell()
+        self._write({'type': 'checkpoint', 'turn': game.get_turncount(), 'heights': heights, 'workers': workers})
+        self._file.flush()
+        self._index.write(f"{game.get_turncount()} {offset}\n")
+        self._index.flush()
+
+    def close(self):
+        '''Closes the journal and its index'''
+        self._file.close()
+        self._index.close()
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(',', ':')).encode() + b'\n')
+
+
+def _read_index(path):
+    '''Returns {turn: offset} of the checkpoints on the line actually played.
+    A checkpoint written after undo/redo drops the checkpoints of later turns, which belong to an abandoned line'''
+    checkpoints = {}
+    with open(path + '.idx') as index:
+        for line in index:
+            turn, offset = map(int, line.split())
+            for later_turn in [t for t in checkpoints if t > turn]:
+                del checkpoints[later_turn]
+            checkpoints[turn] = offset
+    return checkpoints
+
+
+def _restore_checkpoint(game, record):
+    '''Sets the game to the position stored in a checkpoint record'''
+    size = game.get_board().size
+    heights = [[int(record['heights'][x * size + y]) for y in range(size)] for x in range(size)]
+    workers = {name: tuple(position) for name, position in record['workers'].items()}
+    game.restore_position(heights, workers, record['turn'])
+
+
+def load_state(path, turn, manager=None):
+    '''Returns a GameState at the start of the given turn, restored from the nearest checkpoint
+    at or before that turn by replaying at most one checkpoint interval of commands'''
+    checkpoints = _read_index(path)
+    start_turns = [t for t in checkpoints if t <= turn]
+    if not start_turns:
+        raise ValueError(f"No checkpoint at or before turn {turn}")
+
+    with open(path, 'rb') as journal:
+        header = json.loads(journal.readline())
+        game = GameState(header['white'], header['blue'], False, False, manager,
+                         size=header.get('size', BOARD_SIZE))
+        journal.seek(checkpoints[max(start_turns)])
+        for line in journal:
+            record = json.loads(line)
+            if record['turn'] > turn or (record['turn'] == turn and record['type'] != 'checkpoint'):
+                break
+            if record['type'] == 'checkpoint':
+                _restore_checkpoint(game, record)
+                continue
+            worker = game.get_worker(record['worker'])
+            x = worker.x + DIRECTION[record['dir']]['x']
+            y = worker.y + DIRECTION[record['dir']]['y']
+            if record['type'] == 'move':
+                game.move_worker(worker, x, y)
+            else:
+                game.build_at(x, y)
+                game.increment_turn_count()
+
+    if game.get_turncount() != turn:
+        raise ValueError(f"The journal ends before turn {turn}")
+    return game
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("Usage: python journal.py [journal file] [turn]")
+        sys.exit(1)
+    state = load_state(sys.argv[1], int(sys.argv[2]))
+    print(state.get_board())
+    print(f"Turn: {state.get_turncount()}")
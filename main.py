@@ -1,9 +1,36 @@
 import sys
 from game import GameManager
+from journal import GameJournal
+from book import OpeningBook
+from profiler import Profiler
+from session import SessionController
+from player import BOARD_SIZE, parse_weights
+from turn import PLAYER_TYPES
+
+# Options given as --name value, in any position
+OPTIONS = ['--journal', '--book', '--white-weights', '--blue-weights', '--size', '--move-time']
+# Options given as a bare --name, in any position
+FLAGS = ['--profile', '--json']
 
 if __name__ == '__main__':
-    if len(sys.argv) < 1 or len(sys.argv) > 5:
-        print("Usage: python main.py [argv1] [argv2] [argv3] [argv4]")
+    # Separate options from the positional arguments
+    argv = [sys.argv[0]]
+    options = {}
+    i = 1
+    while i < len(sys.argv):
+        if sys.argv[i] in OPTIONS and i + 1 < len(sys.argv):
+            options[sys.argv[i]] = sys.argv[i + 1]
+            i += 2
+        elif sys.argv[i] in FLAGS:
+            options[sys.argv[i]] = True
+            i += 1
+        else:
+            argv.append(sys.argv[i])
+            i += 1
+
+    if len(argv) < 1 or len(argv) > 5:
+        print("Usage: python main.py [argv1] [argv2] [argv3] [argv4] [--journal file] [--book file] [--profile] [--json]"
+              " [--white-weights h,c,d] [--blue-weights h,c,d] [--size n] [--move-time seconds]")
         sys.exit(1)
 
     # Set default values
@@ -11,23 +38,70 @@ if __name__ == '__main__':
     playerBlue = 'human'
     memento = False
     score_display = False
+    journal = None
+    opening_book = None
+    profiler = None
+    weights = {}
+    size = BOARD_SIZE
+    move_budget = None
 
     # Parse command-line arguments
-    if len(sys.argv) >= 2:
-        if sys.argv[1] in ['human', 'random', 'heuristic']:
-            playerWhite = sys.argv[1]
+    if len(argv) >= 2:
+        if argv[1] in PLAYER_TYPES:
+            playerWhite = argv[1]
 
-    if len(sys.argv) >= 3:
-        if sys.argv[2] in ['human', 'random', 'heuristic']:
-            playerBlue = sys.argv[2]
+    if len(argv) >= 3:
+        if argv[2] in PLAYER_TYPES:
+            playerBlue = argv[2]
 
-    if len(sys.argv) >= 4:
-        if sys.argv[3] == 'on':
+    if len(argv) >= 4:
+        if argv[3] == 'on':
             memento = True
 
-    if len(sys.argv) >= 5:
-        if sys.argv[4] == 'on':
+    if len(argv) >= 5:
+        if argv[4] == 'on':
             score_display = True
 
-    # Run the game
-    GameManager(playerWhite, playerBlue, memento, score_display).run()
\ No newline at end of file
+    if '--journal' in options:
+        journal = GameJournal(options['--journal'])
+
+    if '--book' in options:
+        opening_book = OpeningBook(options['--book'])
+
+    if '--profile' in options:
+        profiler = Profiler()
+
+    for color in ['white', 'blue']:
+        if f'--{color}-weights' in options:
+            try:
+                weights[color] = parse_weights(options[f'--{color}-weights'])
+            except ValueError as error:
+                print(error)
+                sys.exit(1)
+
+    if '--size' in options:
+        if not options['--size'].isdigit() or int(options['--size']) < 4:
+            print("--size must be a whole number of at least 4")
+            sys.exit(1)
+        size = int(options['--size'])
+        if size != BOARD_SIZE and ('search' in (playerWhite, playerBlue) or 'mcts' in (playerWhite, playerBlue)):
+            print(f"search and mcts players only play on {BOARD_SIZE}x{BOARD_SIZE} boards")
+            sys.exit(1)
+
+    if '--move-time' in options:
+        try:
+            move_budget = float(options['--move-time'])
+        except ValueError:
+            move_budget = 0
+        if move_budget <= 0:
+            print("--move-time must be a positive number of seconds")
+            sys.exit(1)
+
+    if '--json' in options and 'human' in (playerWhite, playerBlue):
+        print("--json plays computer players only")
+        sys.exit(1)
+
+    # Run games until the players stop asking for another
+    SessionController(GameManager(playerWhite, playerBlue, memento, score_display, journal, opening_book, profiler,
+                                  '--json' in options, weights.get('white'), weights.get('blue'), size,
+                                  move_budget)).run()
@@ -0,0 +1,187 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+# Pool of rollout processes, kept between moves so a game pays the start-up cost once
+_pool = None
+_pool_jobs = None
+
+# Seconds before a search's deadline at which the trees stop, leaving time to send their statistics back
+RESULT_MARGIN = 0.005
+
+
+class Node:
+    '''A node of the search tree, reached by playing action. Wins are counted for the side that played it.
+    Nodes hold no link to their parent, so a finished tree has no reference cycles and is freed as soon as
+    it is dropped rather than left for a full garbage collection'''
+    __slots__ = ('action', 'mover', 'children', 'untried_actions', 'visits', 'wins')
+
+    def __init__(self, action, mover, untried_actions):
+        self.action = action
+        self.mover = mover
+        self.children = []
+        self.untried_actions = untried_actions
+        self.visits = 0
+        self.wins = 0.0
+
+    def select_child(self, exploration):
+        '''Returns the child with the highest UCT value'''
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+
+class MonteCarloTreeSearch:
+    '''UCT search from a BitBoard position. Runs a fixed number of playouts or until a time limit,
+    with random rollouts played on a copy of the board'''
+    def __init__(self, bitboard, worker_names, opponent_names, root_actions=None, exploration=1.4, seed=None):
+        self._bitboard = bitboard
+        self._sides = (tuple(worker_names), tuple(opponent_names))
+        self._exploration = exploration
+        self._random = random.Random(seed)
+        if root_actions is None:
+            root_actions = list(bitboard.generate_actions(self._sides[0]))
+        # The root is reached by the opponent's last move, so its children are played by side 0
+        self._root = Node(None, 1, list(root_actions))
+        self.playouts = 0
+
+    def run(self, playouts=None, time_limit=None):
+        '''Runs playouts until the playout count or the time limit is reached, whichever comes first'''
+        if playouts is None and time_limit is None:
+            raise ValueError("Either a number of playouts or a time limit is required")
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        while playouts is None or self.playouts < playouts:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            self._playout()
+            self.playouts += 1
+
+    def root_statistics(self):
+        '''Returns {action: (visits, wins)} for every child of the root'''
+        return {child.action: (child.visits, child.wins) for child in self._root.children}
+
+    def _playout(self):
+        '''Selects a leaf, expands it, plays a random rollout from it and backpropagates the winner'''
+        board = self._bitboard.copy()
+        node = self._root
+        path = [node]
+        winner = None
+
+        # Selection
+        while not node.untried_actions and node.children:
+            node = node.select_child(self._exploration)
+            path.append(node)
+            winner = self._play(board, node.action, node.mover)
+            if winner is not None:
+                break
+
+        # Expansion
+        if winner is None and node.untried_actions:
+            actions = node.untried_actions
+            action = actions.pop(self._random.randrange(len(actions)))
+            mover = 1 - node.mover
+            winner = self._play(board, action, mover)
+            child_actions = [] if winner is not None \
+                else list(board.generate_actions(self._sides[1 - mover]))
+            child = Node(action, mover, child_actions)
+            node.children.append(child)
+            path.append(child)
+            node = child
+
+        # Simulation
+        if winner is None:
+            winner = self._rollout(board, 1 - node.mover)
+
+        # Backpropagation
+        for node in path:
+            node.visits += 1
+            if node.mover == winner:
+                node.wins += 1
+
+    def _play(self, board, action, mover):
+        '''Plays an action on the board. Returns the mover if it wins, the other side if the next side
+        cannot move, else None'''
+        worker_name, move_square, build_square = action
+        if board.heights[move_square] == 3:
+            return mover
+        board.apply(worker_name, move_square, build_square)
+        if not any(board.can_move(name) for name in self._sides[1 - mover]):
+            return mover
+        return None
+
+    def _rollout(self, board, side):
+        '''Plays random moves, taking a winning move whenever one exists, and returns the winning side'''
+        heights = board.heights
+        while True:
+            actions = list(board.generate_actions(self._sides[side]))
+            if not actions:
+                return 1 - side
+            for action in actions:
+                if heights[action[1]] == 3:
+                    return side
+            board.apply(*self._random.choice(actions))
+            side = 1 - side
+
+
+def _run_tree(bitboard, worker_names, opponent_names, root_actions, playouts, time_limit, exploration, seed,
+              stop_at=None):
+    '''Builds one independent tree and returns its root statistics. The tree also stops at stop_at, a time.time()
+    value, as wall-clock time is shared by processes and a tree may start well after it was submitted'''
+    if stop_at is not None:
+        remaining = max(0.0, stop_at - time.time())
+        time_limit = remaining if time_limit is None else min(time_limit, remaining)
+    tree = MonteCarloTreeSearch(bitboard, worker_names, opponent_names, root_actions, exploration, seed)
+    tree.run(playouts, time_limit)
+    return tree.root_statistics()
+
+
+def _get_pool(jobs):
+    '''Returns the shared process pool, creating it for the given number of processes if needed'''
+    global _pool, _pool_jobs
+    if _pool is None or _pool_jobs != jobs:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = ProcessPoolExecutor(max_workers=jobs)
+        _pool_jobs = jobs
+    return _pool
+
+
+def parallel_search(bitboard, worker_names, opponent_names, root_actions=None, playouts=None, time_limit=None,
+                    jobs=None, exploration=1.4, seed=None, deadline=None):
+    '''Root-parallel MCTS: builds one tree per process from the same position, merges their root statistics
+    and returns (best action, merged {action: (visits, wins)}). The playout count is split across processes.
+    With a deadline (a time.perf_counter() value), the trees stop just before it, trees that have not reported
+    back by then are left out or cancelled, and the best action is None if none has'''
+    jobs = jobs or os.cpu_count() or 1
+    if seed is None:
+        seed = random.getrandbits(32)
+    tree_playouts = None if playouts is None else max(1, playouts // jobs)
+    stop_at = None if deadline is None else time.time() + deadline - time.perf_counter() - RESULT_MARGIN
+    arguments = [(bitboard, worker_names, opponent_names, root_actions, tree_playouts, time_limit, exploration,
+                  seed + i, stop_at) for i in range(jobs)]
+
+    if jobs == 1:
+        results = [_run_tree(*arguments[0])]
+    else:
+        pool = _get_pool(jobs)
+        futures = [pool.submit(_run_tree, *args) for args in arguments]
+        if deadline is None:
+            results = [future.result() for future in futures]
+        else:
+            done, pending = wait(futures, timeout=max(0.0, deadline - time.perf_counter()))
+            # Trees still queued are dropped; running ones stop by themselves at stop_at
+            for future in pending:
+                future.cancel()
+            results = [future.result() for future in futures if future in done]
+
+    merged = {}
+    for statistics in results:
+        for action, (visits, wins) in statistics.items():
+            total_visits, total_wins = merged.get(action, (0, 0.0))
+            merged[action] = (total_visits + visits, total_wins + wins)
+    if not merged:
+        return None, merged
+    best_action = max(merged, key=lambda action: merged[action][0])
+    return best_action, merged
@@ -1,33 +1,81 @@
-import copy
-
 class Memento:
-    '''Stores the santorini game state'''
-    # State is the board data
-    def __init__(self, state):
-        self._state = state
+    '''Stores the change one turn made to the santorini game state:
+    the worker moved, the square it moved from and to, and the square it built on'''
+    def __init__(self, worker_name, from_pos, to_pos, build_pos):
+        self._worker_name = worker_name
+        self._from_pos = from_pos
+        self._to_pos = to_pos
+        self._build_pos = build_pos
 
-    def get_state(self):
-        '''Returns game state'''
-        return self._state
+    def get_worker_name(self):
+        '''Returns the name of the worker that moved'''
+        return self._worker_name
+
+    def get_from_pos(self):
+        '''Returns the (x, y) position the worker moved from'''
+        return self._from_pos
+
+    def get_to_pos(self):
+        '''Returns the (x, y) position the worker moved to'''
+        return self._to_pos
+
+    def get_build_pos(self):
+        '''Returns the (x, y) position the worker built on'''
+        return self._build_pos
 
 
 class Originator:
-    '''Stores a state which can be changed.
-    Also saves states inside mementos and restores states from mementos'''
+    '''Records the move and build of the turn being played and saves them inside mementos.
+    Also undoes and redoes the turn stored in a memento on the game state'''
     def __init__(self, state):
-        self._state = copy.deepcopy(state)
+        self._state = state
+        self._worker_name = None
+        self._from_pos = None
+        self._to_pos = None
+        self._build_pos = None
 
     def change_state(self, state):
-        '''Changes the current state of the originator'''
-        self._state = copy.deepcopy(state)
+        '''Changes the game state the originator works on'''
+        self._state = state
 
-    def save(self):
-        '''Creates an instance of a memento that stores self's state and returns the memento'''
-        return Memento(self._state)
+    def record_move(self, worker_name, from_pos, to_pos):
+        '''Records the move of the turn being played'''
+        self._worker_name = worker_name
+        self._from_pos = from_pos
+        self._to_pos = to_pos
 
-    def restore(self, memento):
-        '''Restores its state from a given memento'''
-        self._state = memento.get_state()
+    def record_build(self, build_pos):
+        '''Records the build of the turn being played'''
+        self._build_pos = build_pos
+
+    def has_recorded_turn(self):
+        '''Returns True if both the move and the build of a turn have been recorded'''
+        return self._worker_name is not None and self._build_pos is not None
+
+    def save(self):
+        '''Creates a memento of the recorded turn, clears the recording and returns the memento'''
+        memento = Memento(self._worker_name, self._from_pos, self._to_pos, self._build_pos)
+        self._worker_name = None
+        self._from_pos = None
+        self._to_pos = None
+        self._build_pos = None
+        return memento
+
+    def undo(self, memento):
+        '''Reverts the turn stored in a given memento: removes the build, moves the worker back
+        and decrements the turn count'''
+        worker = self._state.get_worker(memento.get_worker_name())
+        self._state.unbuild_at(*memento.get_build_pos())
+        self._state.move_worker(worker, *memento.get_from_pos())
+        self._state.decrement_turn_count()
+
+    def redo(self, memento):
+        '''Replays the turn stored in a given memento: moves the worker, builds
+        and increments the turn count'''
+        worker = self._state.get_worker(memento.get_worker_name())
+        self._state.move_worker(worker, *memento.get_to_pos())
+        self._state.build_at(*memento.get_build_pos())
+        self._state.increment_turn_count()
 
     def get_state(self):
         '''Returns state'''
@@ -42,41 +90,29 @@ class CareTaker:
         self._undone = []
 
     def do(self):
-        '''Creates a memento from the originator's current state and
+        '''Creates a memento of the originator's recorded turn and
         appends it to the history list'''
         memento = self._originator.save()
         self._history.append(memento)
 
-    def do_redo(self):
-        '''Creates a memento from the originator's current state and
-        appends it to the undone list'''
-        memento = self._originator.save()
-        self._undone.append(memento)
-
     def undo(self):
-        '''Returns the last memento in history and restores it in originator's state'''
+        '''Undoes the last turn in history and moves its memento to the undone list'''
         memento = self._history.pop()
-        try:
-            self._originator.restore(memento)
-            return memento.get_state()
-        except Exception:
-            self.undo()
+        self._originator.undo(memento)
+        self._undone.append(memento)
 
     def redo(self):
-        '''Returns the last memento in history and restores it in originator's state'''
+        '''Redoes the last undone turn and moves its memento back to the history list'''
         memento = self._undone.pop()
-        try:
-            self._originator.restore(memento)
-            return memento.get_state()
-        except Exception:
-            self.redo()
+        self._originator.redo(memento)
+        self._history.append(memento)
 
     def history_isempty(self):
         '''Returns True if history list is empty'''
         if not len(self._history):
             return True
         return False
-        
+
     def undone_isempty(self):
         '''Returns True if undone list is empty'''
         if not len(self._undone):
@@ -85,4 +121,9 @@ class CareTaker:
 
     def clear_undone(self):
         '''Clears the list of undone. Do this when player chooses "next"'''
-        self._undone = []
\ No newline at end of file
+        self._undone = []
+
+    def clear(self):
+        '''Clears both the history and the undone list, for a new game'''
+        self._history.clear()
+        self._undone.clear()
@@ -32,7 +32,7 @@ class EndGameObserver(Observer):
 
     def update(self, game_state):
         '''Responds to the game state
-        If the game state is end, it will prompt to play again and either set restart as True or exit game'''
+        If the game state is end, it will prompt to play again and set restart to True or False'''
         if game_state == "end":
             while True:
                 restart = input("Play again?\n").lower()
@@ -40,7 +40,8 @@ class EndGameObserver(Observer):
                     self._restart = True
                     break
                 elif restart == "no":
-                    exit(0)
+                    self._restart = False
+                    break
                 else:
                     continue
 
@@ -0,0 +1,109 @@
+import argparse
+import sys
+import time
+from board import BitBoard
+from game import GameState
+from journal import load_state
+from player import BOARD_SIZE, decode_action
+from record import SIDE_WORKERS
+
+
+def perft(game, depth):
+    '''Returns the number of leaf positions depth turns below a GameState, playing every legal action of
+    GameState.legal_actions with apply and undo. A position with a worker on level 3 has been won and has no
+    turns below it, and neither has a position whose side to move cannot move. The state is left unchanged'''
+    if depth == 0:
+        return 1
+    if game.get_board().win_condition_satisfied():
+        return 0
+    actions = game.legal_actions()
+    if depth == 1:
+        return len(actions)
+    nodes = 0
+    for action in actions:
+        game.apply(action)
+        nodes += perft(game, depth - 1)
+        game.undo(action)
+    return nodes
+
+
+def divide(game, depth):
+    '''Returns {action code: perft of the position after it} for every legal action of the side to move'''
+    counts = {}
+    if depth == 0 or game.get_board().win_condition_satisfied():
+        return counts
+    for action in game.legal_actions():
+        game.apply(action)
+        counts[action] = perft(game, depth - 1)
+        game.undo(action)
+    return counts
+
+
+def perft_bitboard(bitboard, worker_names, opponent_names, depth):
+    '''Returns perft of a BitBoard position with worker_names to move, counted with BitBoard.generate_actions,
+    as an independent check of perft'''
+    if depth == 0:
+        return 1
+    heights = bitboard.heights
+    if any(heights[square] == 3 for square in bitboard.workers.values()):
+        return 0
+    return _perft_bitboard(bitboard, worker_names, opponent_names, depth)
+
+
+def _perft_bitboard(bitboard, worker_names, opponent_names, depth):
+    heights = bitboard.heights
+    nodes = 0
+    for worker_name, move_square, build_square in bitboard.generate_actions(worker_names):
+        if depth == 1:
+            nodes += 1
+        elif heights[move_square] != 3:
+            from_square = bitboard.apply(worker_name, move_square, build_square)
+            nodes += _perft_bitboard(bitboard, opponent_names, worker_names, depth - 1)
+            bitboard.undo(worker_name, from_square, build_square)
+        # Moving onto level 3 wins, so the position after it has no leaves below it
+    return nodes
+
+
+def format_action(game, action):
+    '''Returns an action code of the side to move as "WORKER,MOVE,BUILD"'''
+    worker_index, move_dir, build_dir = decode_action(action)
+    return f"{SIDE_WORKERS[(game.get_turncount() + 1) % 2][worker_index]},{move_dir},{build_dir}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Count the leaf positions a number of turns below a position")
+    parser.add_argument('depth', type=int, help="number of turns to play out")
+    parser.add_argument('--divide', action='store_true', help="also print the count below every legal action")
+    parser.add_argument('--size', type=int, default=BOARD_SIZE, help="board size of the starting position")
+    parser.add_argument('--journal', nargs=2, metavar=('FILE', 'TURN'),
+                        help="count from the position at a turn of a game journal instead of the start")
+    parser.add_argument('--bitboard', action='store_true',
+                        help="check the count against the bitboard move generator (5x5 boards only)")
+    args = parser.parse_args()
+
+    if args.journal is not None:
+        game = load_state(args.journal[0], int(args.journal[1]))
+    else:
+        game = GameState('random', 'random', False, False, None, size=args.size)
+
+    start = time.perf_counter()
+    if args.divide:
+        counts = divide(game, args.depth)
+        for action, count in counts.items():
+            print(f"{format_action(game, action)}: {count:,}")
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(game, args.depth)
+    elapsed = time.perf_counter() - start
+    print(f"Nodes: {nodes:,}")
+    print(f"Time: {elapsed:.3f} s ({nodes / elapsed if elapsed else 0:,.0f} nodes/s)")
+
+    if args.bitboard:
+        worker_names = SIDE_WORKERS[(game.get_turncount() + 1) % 2]
+        opponent_names = SIDE_WORKERS[game.get_turncount() % 2]
+        bitboard_nodes = perft_bitboard(BitBoard.from_board(game.get_board()), worker_names, opponent_names,
+                                        args.depth)
+        if bitboard_nodes != nodes:
+            print(f"MISMATCH: bitboard counts {bitboard_nodes:,}")
+            sys.exit(1)
+        print("Bitboard count matches")
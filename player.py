@@ -1,21 +1,39 @@
 from command import MoveCommand, BuildCommand
+from geometry import DIRECTION, BOARD_SIZE, get_geometry
+
+# DIRECTION_INDEX[direction] -> position of the direction in DIRECTION, used to encode actions
+DIRECTIONS = list(DIRECTION)
+DIRECTION_INDEX = {dir: index for index, dir in enumerate(DIRECTIONS)}
+
+
+def encode_action(worker_index, move_dir, build_dir):
+    '''Encodes a turn as one of 128 action codes: worker (0-1) x move direction (0-7) x build direction (0-7)'''
+    return (worker_index << 6) | (DIRECTION_INDEX[move_dir] << 3) | DIRECTION_INDEX[build_dir]
+
+
+def decode_action(action):
+    '''Decodes an action code into (worker index, move direction, build direction)'''
+    return action >> 6, DIRECTIONS[(action >> 3) & 7], DIRECTIONS[action & 7]
+
+# Default (height, center, distance) weights of the heuristic move score
+DEFAULT_WEIGHTS = (3, 2, 1)
+
+
+def parse_weights(text):
+    '''Parses comma-separated "height,center,distance" weights, e.g. "3,2,1". Raises ValueError if malformed'''
+    weights = tuple(float(weight) for weight in text.split(','))
+    if len(weights) != len(DEFAULT_WEIGHTS):
+        raise ValueError(f"Expected {len(DEFAULT_WEIGHTS)} comma-separated weights, got '{text}'")
+    return tuple(int(weight) if weight.is_integer() else weight for weight in weights)
 
-DIRECTION = {
-    'n': {'y': 0, 'x': -1},
-    'ne': {'y': 1, 'x': -1},
-    'e': {'y': 1, 'x': 0},
-    'se': {'y': 1, 'x': 1},
-    's': {'y': 0, 'x': 1},
-    'sw': {'y': -1, 'x': 1},
-    'w': {'y': -1, 'x': 0},
-    'nw': {'y': -1, 'x': -1},
-}
 
 class Player:
-    '''A player with 2 workers, a specified player type, and a reference to the board and game manager'''
-    def __init__(self, board, player_type, manager):
+    '''A player with 2 workers, a specified player type, heuristic weights, and a reference to the board and
+    game manager'''
+    def __init__(self, board, player_type, manager, weights=None):
         self.workers = f'{self._worker1.name}{self._worker2.name}'
         self.type = player_type
+        self.weights = tuple(weights) if weights is not None else DEFAULT_WEIGHTS
         self._board = board
         self._manager = manager
         self._board.set_worker_at_cell(self._worker1.name, self._worker1.x, self._worker1.y)
@@ -37,7 +55,7 @@ class Player:
     
     def workers_cant_move(self):
         '''Returns True if both of this player's workers cannot move'''
-        return self._worker1.no_moves_left(self._board) and self._worker2.no_moves_left(self._board)
+        return self._board.get_mobility(self._worker1.name) == 0 and self._board.get_mobility(self._worker2.name) == 0
     
     def get_workers(self):
         '''Returns both workers'''
@@ -46,35 +64,45 @@ class Player:
     def move(self, worker, direction):
         '''Calls move command'''
         move_command = MoveCommand(self._manager, worker, direction)
-        move_command.execute()
+        self._manager.execute_command(move_command)
 
     def build(self, worker, direction):
         '''Calls build command'''
         build_command = BuildCommand(self._manager, worker, direction)
-        build_command.execute()
+        self._manager.execute_command(build_command)
+
+
+def starting_positions(size=BOARD_SIZE):
+    '''Returns {worker name: (x, y)} of the starting position, each worker one square in from a corner'''
+    return {'A': (size - 2, 1), 'B': (1, size - 2), 'Y': (1, 1), 'Z': (size - 2, size - 2)}
 
 
 class PlayerWhite(Player):
-    def __init__(self, board, player_type, manager):
+    def __init__(self, board, player_type, manager, weights=None):
         self.color = 'white'
-        self._worker1 = Worker('A', 3, 1)
-        self._worker2 = Worker('B', 1, 3)
-        super().__init__(board, player_type, manager)
+        start = starting_positions(board.size)
+        self._worker1 = Worker('A', *start['A'], board.geometry)
+        self._worker2 = Worker('B', *start['B'], board.geometry)
+        super().__init__(board, player_type, manager, weights)
 
 
 class PlayerBlue(Player):
-    def __init__(self, board, player_type, manager):
+    def __init__(self, board, player_type, manager, weights=None):
         self.color = 'blue'
-        self._worker1 = Worker('Y', 1, 1)
-        self._worker2 = Worker('Z', 3, 3)
-        super().__init__(board, player_type, manager)
+        start = starting_positions(board.size)
+        self._worker1 = Worker('Y', *start['Y'], board.geometry)
+        self._worker2 = Worker('Z', *start['Z'], board.geometry)
+        super().__init__(board, player_type, manager, weights)
     
 class Worker:
     '''A worker with an x, y coordinate that corresponds with the worker's position on the game board'''
-    def __init__(self, name, x, y):
+    __slots__ = ('name', 'x', 'y', '_geometry')
+
+    def __init__(self, name, x, y, geometry=None):
         self.name = name
         self.x = x
         self.y = y
+        self._geometry = geometry if geometry is not None else get_geometry()
 
     def update_pos(self, x, y):
         '''Updates position of worker with the given x, y coordinates'''
@@ -84,67 +112,15 @@ class Worker:
     def no_moves_left(self, board):
         '''Returns True if worker is not able to move'''
         curr_cell = board.get_specific_cell(self.x, self.y)
-        for dir in DIRECTION:
-            new_x = self.x + DIRECTION[dir]['x']
-            new_y = self.y + DIRECTION[dir]['y']
-            if board.in_bounds(new_x, new_y):
-                new_cell = board.get_specific_cell(new_x, new_y)
-                if new_cell.is_valid_move(curr_cell):
-                    return False
+        for _, new_x, new_y in board.geometry.adjacent[self.x][self.y]:
+            if board.get_specific_cell(new_x, new_y).is_valid_move(curr_cell):
+                return False
         return True
     
     def enumerate_moves(self, board):
-        '''Returns dict of available moves and builds'''
-        available_move_and_builds = {}
-        curr_cell = board.get_specific_cell(self.x, self.y)
-        # Iterate through every move direction 
-        for move_dir in DIRECTION:
-            move_x = self.x + DIRECTION[move_dir]['x']
-            move_y = self.y + DIRECTION[move_dir]['y']
-            if board.in_bounds(move_x, move_y):
-                # Get new coordinates once move is performed
-                new_cell = board.get_specific_cell(move_x, move_y)
-                if new_cell.is_valid_move(curr_cell):
-                    available_builds = []
-                    # Iterate through every build direction after move has been performed
-                    for build_dir in DIRECTION:
-                        new_build_x = move_x + DIRECTION[build_dir]['x']
-                        new_build_y = move_y + DIRECTION[build_dir]['y']
-                        if board.in_bounds(new_build_x, new_build_y):
-                            new_build_cell = board.get_specific_cell(new_build_x, new_build_y)
-                            if new_build_cell.is_valid_build(self.x, self.y):
-                                # Append all possible builds to a list
-                                available_builds.append(build_dir)
-                        # Append all possible builds to the move direction key
-                        available_move_and_builds[move_dir] = available_builds
-        return available_move_and_builds
+        '''Returns dict of available moves and builds. The board caches it, so it must not be modified'''
+        return board.get_legal_moves(self.name, self.x, self.y)
     
     def get_ring_level(self, x_pos, y_pos):
         '''Returns the ring level'''
-        # center
-        if x_pos == 2 and y_pos == 2:
-            return 2
-        # top row of 2nd inner ring
-        elif x_pos == 1 and 1 <= y_pos <= 3:
-            return 1
-        # middle row of 2nd inner ring
-        elif x_pos == 2 and (y_pos == 1 or y_pos == 3):
-            return 1
-        # bottom row of 2nd inner ring
-        elif x_pos == 3 and 1 <= y_pos <= 3:
-            return 1
-        # top row of outer most ring
-        elif x_pos == 0 and 0 <= y_pos <= 4:
-            return 0
-        # second row of outer most ring
-        elif x_pos== 1 and (y_pos == 0 or y_pos == 4):
-            return 0
-        # third row of outer most ring
-        elif x_pos == 2 and (y_pos == 0 or y_pos == 4):
-            return 0
-        # fourth row of outer most ring
-        elif x_pos == 3 and (y_pos == 0 or y_pos == 4):
-            return 0
-        # bottom row of outer most ring
-        elif x_pos == 4 and 0 <= y_pos <= 4:
-            return 0
\ No newline at end of file
+        return self._geometry.ring_levels[x_pos][y_pos]
\ No newline at end of file
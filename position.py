@@ -0,0 +1,82 @@
+import math
+import struct
+from board import Board
+
+# Worker order of Position.workers
+WORKER_NAMES = ('A', 'B', 'Y', 'Z')
+
+# Turn count stored after the heights and worker squares by Position.to_bytes
+TURN = struct.Struct('<H')
+
+
+class Position:
+    '''Compact snapshot of a game position: one height byte per square and one square byte per worker
+    (in A, B, Y, Z order), where square = x * size + y, plus the turn count.
+    Converts losslessly to and from Board and GameState, and can be used as a dict key'''
+    __slots__ = ('heights', 'workers', 'turn')
+
+    def __init__(self, heights, workers, turn=1):
+        self.heights = bytes(heights)
+        self.workers = bytes(workers)
+        self.turn = turn
+
+    @property
+    def size(self):
+        '''Returns the board size'''
+        return math.isqrt(len(self.heights))
+
+    @classmethod
+    def from_board(cls, board, turn=1):
+        '''Creates the position of a Board's heights and workers at the given turn'''
+        size = board.size
+        heights = bytes(board.get_specific_cell(x, y).get_height() for x in range(size) for y in range(size))
+        squares = {}
+        for x in range(size):
+            for y in range(size):
+                name = board.get_specific_cell(x, y).get_occupying_worker()
+                if name is not None:
+                    squares[name] = x * size + y
+        return cls(heights, bytes(squares[name] for name in WORKER_NAMES), turn)
+
+    @classmethod
+    def from_game_state(cls, game):
+        '''Creates the position of a GameState'''
+        return cls.from_board(game.get_board(), game.get_turncount())
+
+    def to_board(self):
+        '''Returns a new Board with this position's heights and workers'''
+        board = Board(self.size)
+        board.restore(self._height_rows(), self._worker_positions())
+        return board
+
+    def restore(self, game):
+        '''Sets a GameState of the same board size to this position'''
+        game.restore_position(self._height_rows(), self._worker_positions(), self.turn)
+
+    def to_bytes(self):
+        '''Packs the position into size * size + 6 bytes'''
+        return self.heights + self.workers + TURN.pack(self.turn)
+
+    @classmethod
+    def from_bytes(cls, data):
+        '''Unpacks a position packed by to_bytes'''
+        squares = len(data) - len(WORKER_NAMES) - TURN.size
+        turn, = TURN.unpack_from(data, squares + len(WORKER_NAMES))
+        return cls(data[:squares], data[squares:squares + len(WORKER_NAMES)], turn)
+
+    def _height_rows(self):
+        size = self.size
+        return [self.heights[x * size:(x + 1) * size] for x in range(size)]
+
+    def _worker_positions(self):
+        return {name: divmod(square, self.size) for name, square in zip(WORKER_NAMES, self.workers)}
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self.heights == other.heights and self.workers == other.workers \
+            and self.turn == other.turn
+
+    def __hash__(self):
+        return hash((self.heights, self.workers, self.turn))
+
+    def __repr__(self):
+        return f"Position({self.heights!r}, {self.workers!r}, {self.turn})"
@@ -0,0 +1,103 @@
+import time
+from contextlib import nullcontext
+
+# Shared do-nothing context manager handed out when profiling is off
+_NO_PHASE = nullcontext()
+
+
+class _Phase:
+    '''Context manager that records the wall time of one phase call'''
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profiler.record(self._name, time.perf_counter() - self._start)
+        return False
+
+
+def _percentile(sorted_values, fraction):
+    '''Returns the value at the given fraction of an already sorted list'''
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Profiler:
+    '''Records the wall time and call count of each phase of the game loop,
+    the number of candidates evaluated by each computer turn and the fraction of the move budget it used'''
+    def __init__(self):
+        self._timings = {}
+        self._candidates = {}
+        self._budgets = {}
+
+    def enabled(self):
+        '''Returns True, as this profiler records'''
+        return True
+
+    def phase(self, name):
+        '''Returns a context manager timing one call of the named phase'''
+        return _Phase(self, name)
+
+    def record(self, name, seconds):
+        '''Records one call of the named phase that took the given number of seconds'''
+        self._timings.setdefault(name, []).append(seconds)
+
+    def count_candidates(self, turn_type, count):
+        '''Records the number of candidates (moves, nodes or playouts) one turn of the given type evaluated'''
+        self._candidates.setdefault(turn_type, []).append(count)
+
+    def record_budget(self, turn_type, fraction):
+        '''Records the fraction of its move budget one turn of the given type used'''
+        self._budgets.setdefault(turn_type, []).append(fraction)
+
+    def summary(self):
+        '''Returns a table of calls, total time and time percentiles per phase,
+        candidates per turn and the fraction of the move budget used for each computer turn type'''
+        lines = [f"{'phase':24} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'p50 ms':>9} {'p90 ms':>9} "
+                 f"{'p99 ms':>9} {'max ms':>9}"]
+        for name, timings in sorted(self._timings.items(), key=lambda item: -sum(item[1])):
+            ordered = sorted(timings)
+            lines.append(f"{name:24} {len(ordered):>7} {sum(ordered) * 1000:>10.2f} "
+                         f"{sum(ordered) / len(ordered) * 1000:>9.3f} {_percentile(ordered, 0.5) * 1000:>9.3f} "
+                         f"{_percentile(ordered, 0.9) * 1000:>9.3f} {_percentile(ordered, 0.99) * 1000:>9.3f} "
+                         f"{ordered[-1] * 1000:>9.3f}")
+        if self._candidates:
+            lines.append(f"{'candidates per turn':24} {'turns':>7} {'mean':>10} {'p50':>9} {'max':>9}")
+            for turn_type, counts in sorted(self._candidates.items()):
+                ordered = sorted(counts)
+                lines.append(f"{turn_type:24} {len(ordered):>7} {sum(ordered) / len(ordered):>10.1f} "
+                             f"{_percentile(ordered, 0.5):>9} {ordered[-1]:>9}")
+        if self._budgets:
+            lines.append(f"{'budget used':24} {'turns':>7} {'mean':>10} {'p50':>9} {'max':>9}")
+            for turn_type, fractions in sorted(self._budgets.items()):
+                ordered = sorted(fractions)
+                lines.append(f"{turn_type:24} {len(ordered):>7} {sum(ordered) / len(ordered):>10.1%} "
+                             f"{_percentile(ordered, 0.5):>9.1%} {ordered[-1]:>9.1%}")
+        return '\n'.join(lines)
+
+
+class NullProfiler:
+    '''Profiler used when profiling is off. Every hook does nothing'''
+    def enabled(self):
+        '''Returns False, as this profiler does not record'''
+        return False
+
+    def phase(self, name):
+        '''Returns a shared context manager that does nothing'''
+        return _NO_PHASE
+
+    def record(self, name, seconds):
+        pass
+
+    def count_candidates(self, turn_type, count):
+        pass
+
+    def record_budget(self, turn_type, fraction):
+        pass
+
+    def summary(self):
+        return ''
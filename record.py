@@ -0,0 +1,116 @@
+import mmap
+import struct
+import sys
+from player import encode_action, decode_action
+from turn import PLAYER_TYPES
+
+# A record file starts with MAGIC and a format version byte, followed by any number of games.
+# Each game is a GAME_HEADER (white type, blue type, winner, seed, number of turns), with player types stored
+# as indexes into turn.PLAYER_TYPES, followed by one action byte per turn, as encoded by player.encode_action
+MAGIC = b'SNTR'
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sB')
+GAME_HEADER = struct.Struct('<BBBQH')
+
+WINNERS = ['white', 'blue']
+NO_WINNER = 255
+
+# Largest seed a GAME_HEADER can hold
+MAX_SEED = 2 ** 64 - 1
+
+# Worker names of the side to move, white on odd turns and blue on even turns
+SIDE_WORKERS = (('A', 'B'), ('Y', 'Z'))
+
+
+def parse_seed(text):
+    '''Parses a game seed, which must fit in a GAME_HEADER: a whole number from 0 to MAX_SEED.
+    Raises ValueError otherwise'''
+    seed = int(text)
+    if not 0 <= seed <= MAX_SEED:
+        raise ValueError(f"Seeds range from 0 to {MAX_SEED}, got {seed}")
+    return seed
+
+
+class GameRecord:
+    '''One recorded game: player types, seed, winner (or None) and the action byte of every turn'''
+    def __init__(self, playerWhite_type, playerBlue_type, seed, actions, winner=None):
+        self.playerWhite_type = playerWhite_type
+        self.playerBlue_type = playerBlue_type
+        self.seed = seed
+        self.actions = actions
+        self.winner = winner
+
+    def __len__(self):
+        return len(self.actions)
+
+    def turns(self):
+        '''Yields the (worker name, move direction, build direction) of every turn'''
+        for turn, action in enumerate(self.actions):
+            worker_index, move_dir, build_dir = decode_action(action)
+            yield SIDE_WORKERS[turn % 2][worker_index], move_dir, build_dir
+
+
+class RecordWriter:
+    '''Streams games to a record file one at a time'''
+    def __init__(self, path):
+        self._file = open(path, 'wb')
+        self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def write(self, record):
+        '''Appends one game record'''
+        if len(record.actions) > 0xFFFF:
+            raise ValueError("A game record holds at most 65535 turns")
+        if not 0 <= record.seed <= MAX_SEED:
+            raise ValueError(f"A game record holds seeds from 0 to {MAX_SEED}, got {record.seed}")
+        winner = NO_WINNER if record.winner is None else WINNERS.index(record.winner)
+        self._file.write(GAME_HEADER.pack(PLAYER_TYPES.index(record.playerWhite_type),
+                                          PLAYER_TYPES.index(record.playerBlue_type),
+                                          winner, record.seed, len(record.actions)))
+        self._file.write(bytes(record.actions))
+
+    def close(self):
+        '''Closes the record file'''
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_records(path):
+    '''Yields every GameRecord of a record file. The file is memory-mapped, so only the game
+    being yielded is ever held in memory'''
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version = FILE_HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} game record file")
+            offset = FILE_HEADER.size
+            while offset < len(data):
+                white, blue, winner, seed, turns = GAME_HEADER.unpack_from(data, offset)
+                offset += GAME_HEADER.size
+                actions = data[offset:offset + turns]
+                offset += turns
+                yield GameRecord(PLAYER_TYPES[white], PLAYER_TYPES[blue], seed, actions,
+                                 None if winner == NO_WINNER else WINNERS[winner])
+
+
+def record_turn(player, worker, move_dir, build_dir):
+    '''Returns the action byte of a turn played by the given player'''
+    return encode_action(player.get_workers().index(worker), move_dir, build_dir)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python record.py [record file]")
+        sys.exit(1)
+    games = 0
+    turns = 0
+    wins = {'white': 0, 'blue': 0, None: 0}
+    for record in read_records(sys.argv[1]):
+        games += 1
+        turns += len(record)
+        wins[record.winner] += 1
+    print(f"Games: {games}, turns: {turns}, white wins: {wins['white']}, blue wins: {wins['blue']}")
@@ -0,0 +1,209 @@
+import time
+from board import DISTANCE, RING_BY_SQUARE
+from player import DEFAULT_WEIGHTS
+from position import Position, WORKER_NAMES
+from symmetry import unique_actions
+from zobrist import SIDE_KEY, EXACT, LOWER, UPPER
+
+# Score of a won position; wins found sooner score higher
+WIN_SCORE = 10000
+
+# Scores beyond this are wins or losses, stored in the transposition table relative to the node
+WIN_THRESHOLD = WIN_SCORE - 1000
+
+
+class SearchTimeout(Exception):
+    '''Raised inside the search when the time budget has run out'''
+
+
+class AlphaBetaSearch:
+    '''Negamax search with alpha-beta pruning and iterative deepening under a wall-clock time budget.
+    Moves are made and unmade in place on a BitBoard, which is left unchanged once the search returns.
+    Results are shared through an optional transposition table keyed by the BitBoard's Zobrist key.
+    Root actions that a symmetry of the root position maps onto an earlier root action are skipped unless
+    unique_root is False'''
+    def __init__(self, bitboard, worker_names, opponent_names, time_budget=1.0, max_depth=64, weights=DEFAULT_WEIGHTS,
+                 table=None, blue_to_move=False, unique_root=True):
+        self._bitboard = bitboard
+        self._worker_names = tuple(worker_names)
+        self._opponent_names = tuple(opponent_names)
+        self._time_budget = time_budget
+        self._max_depth = max_depth
+        self._weights = weights
+        self._table = table
+        self._side_key = SIDE_KEY if blue_to_move else 0
+        self._unique_root = unique_root
+        self._deadline = None
+        self.nodes = 0
+        self.depth = 0
+        self.timed_out = False
+
+    def search(self):
+        '''Returns the best (worker name, move square, build square) found within the time budget,
+        or None if there is no legal move'''
+        self._deadline = time.perf_counter() + self._time_budget
+        self.nodes = 0
+        self.depth = 0
+        self.timed_out = False
+
+        actions = self._ordered_actions(self._worker_names, self._lookup_move(self._bitboard.key ^ self._side_key))
+        if self._unique_root:
+            bitboard = self._bitboard
+            actions = unique_actions(Position(bitboard.heights, bytes(bitboard.workers[name] for name in WORKER_NAMES)),
+                                     actions)
+        if not actions:
+            return None
+        best_action = actions[0]
+
+        for depth in range(1, self._max_depth + 1):
+            try:
+                score, action = self._search_root(actions, depth)
+            except SearchTimeout:
+                self.timed_out = True
+                break
+            best_action = action
+            self.depth = depth
+
+            # Search the best action first at the next depth, and stop once the result is forced
+            actions.remove(action)
+            actions.insert(0, action)
+            if abs(score) >= WIN_THRESHOLD:
+                break
+        return best_action
+
+    def _search_root(self, actions, depth):
+        '''Searches every root action to the given depth and returns the best score and action'''
+        bitboard = self._bitboard
+        alpha = -WIN_SCORE - 1
+        best_action = actions[0]
+        for action in actions:
+            worker_name, move_square, build_square = action
+            if bitboard.heights[move_square] == 3:
+                return WIN_SCORE - 1, action
+            from_square = bitboard.apply(worker_name, move_square, build_square)
+            try:
+                score = -self._negamax(self._opponent_names, self._worker_names, depth - 1,
+                                       -WIN_SCORE - 1, -alpha, 1, self._side_key ^ SIDE_KEY)
+            finally:
+                bitboard.undo(worker_name, from_square, build_square)
+            if score > alpha:
+                alpha = score
+                best_action = action
+        if self._table is not None:
+            self._table.store(bitboard.key ^ self._side_key, depth, EXACT, alpha, best_action)
+        return alpha, best_action
+
+    def _negamax(self, worker_names, opponent_names, depth, alpha, beta, ply, side_key):
+        '''Returns the score of the position for the side owning worker_names'''
+        self.nodes += 1
+        # Checked often enough that a search overruns its budget by well under a millisecond
+        if not self.nodes & 31 and time.perf_counter() > self._deadline:
+            raise SearchTimeout
+
+        bitboard = self._bitboard
+        if depth == 0:
+            if not any(bitboard.can_move(name) for name in worker_names):
+                return -WIN_SCORE + ply
+            return self._evaluate(worker_names, opponent_names)
+
+        # Reuse a stored result for this position if it was searched at least as deep
+        key = bitboard.key ^ side_key
+        table_move = None
+        if self._table is not None:
+            entry = self._table.get(key)
+            if entry is not None:
+                entry_depth, bound, score, table_move = entry
+                if entry_depth >= depth:
+                    score = self._score_from_table(score, ply)
+                    if bound == EXACT or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+                        return score
+
+        actions = self._ordered_actions(worker_names, table_move)
+        if not actions:
+            return -WIN_SCORE + ply
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        best_action = None
+        for action in actions:
+            worker_name, move_square, build_square = action
+            # Moving onto height 3 wins immediately
+            if bitboard.heights[move_square] == 3:
+                best_score = WIN_SCORE - ply - 1
+                best_action = action
+                break
+            from_square = bitboard.apply(worker_name, move_square, build_square)
+            try:
+                score = -self._negamax(opponent_names, worker_names, depth - 1, -beta, -alpha, ply + 1,
+                                       side_key ^ SIDE_KEY)
+            finally:
+                bitboard.undo(worker_name, from_square, build_square)
+            if score > best_score:
+                best_score = score
+                best_action = action
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if self._table is not None:
+            if best_score <= original_alpha:
+                bound = UPPER
+            elif best_score >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            self._table.store(key, depth, bound, self._score_to_table(best_score, ply), best_action)
+        return best_score
+
+    def _lookup_move(self, key):
+        '''Returns the best move stored for the key, if any'''
+        if self._table is None:
+            return None
+        entry = self._table.get(key)
+        return entry[3] if entry is not None else None
+
+    def _score_to_table(self, score, ply):
+        '''Makes win and loss scores relative to the node so they can be reused at another ply'''
+        if score >= WIN_THRESHOLD:
+            return score + ply
+        if score <= -WIN_THRESHOLD:
+            return score - ply
+        return score
+
+    def _score_from_table(self, score, ply):
+        '''Converts a stored win or loss score back to the current ply'''
+        if score >= WIN_THRESHOLD:
+            return score - ply
+        if score <= -WIN_THRESHOLD:
+            return score + ply
+        return score
+
+    def _ordered_actions(self, worker_names, first_action=None):
+        '''Returns the legal actions for the given workers, the given action first, then moves that climb highest'''
+        heights = self._bitboard.heights
+        actions = list(self._bitboard.generate_actions(worker_names))
+        actions.sort(key=lambda action: heights[action[1]], reverse=True)
+        if first_action is not None and first_action in actions:
+            actions.remove(first_action)
+            actions.insert(0, first_action)
+        return actions
+
+    def _score(self, worker_names, opponent_names):
+        '''Returns the weighted height, center and distance score of the given workers,
+        using the same features as HeuristicTurn'''
+        squares = self._bitboard.workers
+        own_1, own_2 = squares[worker_names[0]], squares[worker_names[1]]
+        heights = self._bitboard.heights
+        height_score = heights[own_1] + heights[own_2]
+        center_score = RING_BY_SQUARE[own_1] + RING_BY_SQUARE[own_2]
+        distance_score = 8
+        for name in opponent_names:
+            opponent = squares[name]
+            distance_score -= min(DISTANCE[own_1][opponent], DISTANCE[own_2][opponent])
+        c1, c2, c3 = self._weights
+        return c1 * height_score + c2 * center_score + c3 * distance_score
+
+    def _evaluate(self, worker_names, opponent_names):
+        '''Returns the leaf evaluation from the point of view of the side owning worker_names'''
+        return self._score(worker_names, opponent_names) - self._score(opponent_names, worker_names)
@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from game import GameManager
+from turn import COMPUTER_TURNS, PLAYER_TYPES
+
+
+class GameSession:
+    '''One client connection. Plays any number of games one after another, each with its own GameManager.
+
+    Client lines:  new WHITE BLUE  |  WORKER MOVE BUILD (when asked for a move)  |  quit (at any prompt)
+    Server lines:  the board, then "turn N COLOR WORKERS", then "move?" for a human player,
+                   "played WORKER,MOVE,BUILD" after every turn, "winner COLOR" at the end of a game,
+                   "ready" when a new game can be started and "error MESSAGE" for any rejected line'''
+    def __init__(self, reader, writer, executor, move_budget=None):
+        self._reader = reader
+        self._writer = writer
+        self._executor = executor
+        self._move_budget = move_budget
+
+    async def run(self):
+        '''Serves the connection until the client quits or disconnects'''
+        await self._send(f"ready: new WHITE BLUE ({', '.join(PLAYER_TYPES)}) or quit")
+        while True:
+            words = await self._read_words()
+            if words is None or words == ['quit']:
+                return
+            if len(words) == 3 and words[0] == 'new' and words[1] in PLAYER_TYPES and words[2] in PLAYER_TYPES:
+                if not await self._play(words[1], words[2]):
+                    return
+                await self._send("ready")
+            else:
+                await self._send("error expected: new WHITE BLUE, or quit")
+
+    async def _play(self, playerWhite_type, playerBlue_type):
+        '''Plays one game to its end. Returns False if the client quit or disconnected during it'''
+        manager = GameManager(playerWhite_type, playerBlue_type, move_budget=self._move_budget)
+        loop = asyncio.get_running_loop()
+        while True:
+            player = manager.alternate_player()
+            await self._send(str(manager.get_board()))
+            await self._send(f"turn {manager.get_turncount()} {player.color} {player.workers}")
+
+            winner = manager.get_winner(player)
+            if winner is not None:
+                await self._send(f"winner {winner}")
+                return True
+
+            if player.type == 'human':
+                move = await self._read_human_move(player, manager)
+                if move is None:
+                    return False
+            else:
+                # Computer turns only read the game, which nothing else touches until they return
+                turn = COMPUTER_TURNS[player.type](manager.get_board(), player, manager)
+                move = await loop.run_in_executor(self._executor, turn.select_move)
+
+            worker, move_dir, build_dir = move
+            player.move(worker, move_dir)
+            player.build(worker, build_dir)
+            await self._send(f"played {worker.name},{move_dir},{build_dir}")
+            manager.increment_turn_count()
+
+    async def _read_human_move(self, player, manager):
+        '''Asks until the client sends a legal (worker, move direction, build direction), or returns None
+        if the client quit or disconnected'''
+        while True:
+            await self._send("move?")
+            words = await self._read_words()
+            if words is None or words == ['quit']:
+                return None
+            if len(words) != 3:
+                await self._send("error expected: WORKER MOVE BUILD")
+                continue
+            name, move_dir, build_dir = words
+            if not player.check_valid_worker(name):
+                await self._send("error That is not your worker")
+                continue
+            worker = player.select_worker(name)
+            builds = worker.enumerate_moves(manager.get_board()).get(move_dir)
+            if builds is None:
+                await self._send(f"error Cannot move {move_dir}")
+            elif build_dir not in builds:
+                await self._send(f"error Cannot build {build_dir}")
+            else:
+                return worker, move_dir, build_dir
+
+    async def _read_words(self):
+        '''Returns the words of the next line from the client, or None if it disconnected'''
+        line = await self._reader.readline()
+        if not line:
+            return None
+        return line.decode(errors='replace').split()
+
+    async def _send(self, text):
+        self._writer.write(text.encode() + b'\n')
+        await self._writer.drain()
+
+
+async def serve(host='127.0.0.1', port=8765, jobs=None, move_budget=None):
+    '''Serves games on the given address until cancelled. Computer turns run on a pool of jobs threads and,
+    given a move budget, answer within that many seconds'''
+    executor = ThreadPoolExecutor(jobs)
+
+    async def handle(reader, writer):
+        try:
+            await GameSession(reader, writer, executor, move_budget).run()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Serving Santorini on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(wait=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Host concurrent Santorini games over a line-based TCP protocol")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="port to listen on (default: 8765)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="threads for computer turns")
+    parser.add_argument('--move-time', type=float, default=None, metavar='SECONDS',
+                        help="longest a computer turn may take to choose its move")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.jobs, args.move_time))
+    except KeyboardInterrupt:
+        pass
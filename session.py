@@ -0,0 +1,16 @@
+class SessionController:
+    '''Plays games one after another in a flat loop for as long as the players ask to play again.
+    Every game reuses one GameManager, reset to the starting position in between, so a session
+    holds the same objects however many games it plays'''
+    def __init__(self, manager):
+        self._manager = manager
+        self._winners = {'white': 0, 'blue': 0}
+
+    def run(self):
+        '''Plays games until the players decline to play again. Returns {color: games won}'''
+        while True:
+            winner = self._manager.run()
+            self._winners[winner] += 1
+            if not self._manager.restart_requested():
+                return self._winners
+            self._manager.reset()
@@ -0,0 +1,129 @@
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from game import GameManager
+from record import MAX_SEED, GameRecord, RecordWriter, parse_seed, record_turn
+from book import OpeningBook
+from player import parse_weights
+from turn import COMPUTER_TURNS
+
+# Opening books opened in this process, by path
+_books = {}
+
+
+def _open_book(path):
+    '''Returns the opening book at the given path, opening it once per process'''
+    if path is None:
+        return None
+    if path not in _books:
+        _books[path] = OpeningBook(path)
+    return _books[path]
+
+
+def play_game(playerWhite_type, playerBlue_type, seed, book_path=None, white_weights=None, blue_weights=None):
+    '''Plays one game without any terminal I/O. Returns the winner's color, the number of turns played
+    and the action byte of every turn'''
+    random.seed(seed)
+    manager = GameManager(playerWhite_type, playerBlue_type, opening_book=_open_book(book_path),
+                          white_weights=white_weights, blue_weights=blue_weights)
+    actions = bytearray()
+    while True:
+        player = manager.alternate_player()
+        winner = manager.get_winner(player)
+        if winner is not None:
+            return winner, manager.get_turncount() - 1, bytes(actions)
+
+        worker, move_dir, build_dir = COMPUTER_TURNS[player.type](manager.get_board(), player, manager).select_move()
+        actions.append(record_turn(player, worker, move_dir, build_dir))
+        player.move(worker, move_dir)
+        player.build(worker, build_dir)
+        manager.increment_turn_count()
+
+
+def play_games(playerWhite_type, playerBlue_type, seeds, book_path=None, white_weights=None, blue_weights=None):
+    '''Plays one game per seed and returns a list of (winner, turns, actions) results'''
+    return [play_game(playerWhite_type, playerBlue_type, seed, book_path, white_weights, blue_weights)
+            for seed in seeds]
+
+
+def simulate(playerWhite_type, playerBlue_type, games, jobs=None, seed=0, chunk_size=50, record_path=None,
+             book_path=None, white_weights=None, blue_weights=None):
+    '''Plays the given number of games across a process pool and returns aggregate results.
+    If a record path is given, every game is also written to that game record file.
+    If a book path is given, computer players consult that opening book.
+    Weights, if given, replace the default heuristic weights of each player'''
+    for player_type in (playerWhite_type, playerBlue_type):
+        if player_type not in COMPUTER_TURNS:
+            raise ValueError(f"Cannot simulate player type '{player_type}'")
+    if games < 1:
+        raise ValueError(f"Cannot simulate {games} games, at least one is needed")
+    # Check every seed fits the record header before any game is played
+    if record_path is not None and seed + games - 1 > MAX_SEED:
+        raise ValueError(f"Seeds {seed} to {seed + games - 1} do not fit a game record, the largest is {MAX_SEED}")
+
+    # Game i is always played with seed + i, so results do not depend on the number of processes
+    seeds = list(range(seed, seed + games))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, games, chunk_size)]
+    writer = RecordWriter(record_path) if record_path is not None else None
+
+    start = time.perf_counter()
+    wins = {'white': 0, 'blue': 0}
+    total_turns = 0
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) if jobs != 1 else nullcontext() as executor:
+            if executor is None:
+                chunk_results = (play_games(playerWhite_type, playerBlue_type, chunk, book_path, white_weights,
+                                            blue_weights) for chunk in chunks)
+            else:
+                futures = [executor.submit(play_games, playerWhite_type, playerBlue_type, chunk, book_path,
+                                           white_weights, blue_weights) for chunk in chunks]
+                chunk_results = (future.result() for future in futures)
+            # Results are consumed chunk by chunk, so recorded games are streamed to disk
+            for chunk, results in zip(chunks, chunk_results):
+                for game_seed, (winner, turns, actions) in zip(chunk, results):
+                    wins[winner] += 1
+                    total_turns += turns
+                    if writer is not None:
+                        writer.write(GameRecord(playerWhite_type, playerBlue_type, game_seed, actions, winner))
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'games': games,
+        'white_win_rate': wins['white'] / games,
+        'blue_win_rate': wins['blue'] / games,
+        'mean_game_length': total_turns / games,
+        'games_per_sec': games / elapsed,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play Santorini games between computer players without a terminal")
+    parser.add_argument('white', choices=sorted(COMPUTER_TURNS))
+    parser.add_argument('blue', choices=sorted(COMPUTER_TURNS))
+    parser.add_argument('-n', '--games', type=int, default=1000, help="number of games to play")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="number of processes (default: one per CPU)")
+    parser.add_argument('--seed', type=parse_seed, default=0, help="seed of the first game (non-negative)")
+    parser.add_argument('--record', metavar='FILE', help="write every game to a binary game record file")
+    parser.add_argument('--book', metavar='FILE', help="opening book for computer players")
+    parser.add_argument('--white-weights', type=parse_weights, metavar='H,C,D',
+                        help="heuristic weights of the white player (default: 3,2,1)")
+    parser.add_argument('--blue-weights', type=parse_weights, metavar='H,C,D',
+                        help="heuristic weights of the blue player (default: 3,2,1)")
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+    if args.record is not None and args.seed + args.games - 1 > MAX_SEED:
+        parser.error(f"--seed plus --games goes past the largest recordable seed, {MAX_SEED}")
+
+    result = simulate(args.white, args.blue, args.games, args.jobs, args.seed, record_path=args.record,
+                      book_path=args.book, white_weights=args.white_weights, blue_weights=args.blue_weights)
+    print(f"Games: {result['games']}")
+    print(f"White win rate: {result['white_win_rate']:.3f}")
+    print(f"Blue win rate: {result['blue_win_rate']:.3f}")
+    print(f"Mean game length: {result['mean_game_length']:.1f} turns")
+    print(f"Games per second: {result['games_per_sec']:.1f}")
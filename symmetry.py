@@ -0,0 +1,161 @@
+from player import BOARD_SIZE, DIRECTION, decode_action, encode_action
+from position import Position, WORKER_NAMES
+
+# The 8 symmetries of a square board (4 rotations and 4 reflections), each given as
+# (swap x and y, then mirror x, then mirror y). Transforms are referred to by index; 0 is the identity
+TRANSFORMS = tuple((swap, flip_x, flip_y) for swap in (False, True) for flip_x in (False, True)
+                   for flip_y in (False, True))
+IDENTITY = 0
+
+
+def _inverse(transform):
+    '''Returns the (swap, flip x, flip y) transform that undoes the given one'''
+    swap, flip_x, flip_y = transform
+    return (swap, flip_y, flip_x) if swap else transform
+
+# INVERSE[transform] -> the transform that maps back
+INVERSE = tuple(TRANSFORMS.index(_inverse(transform)) for transform in TRANSFORMS)
+
+
+def _map_vector(transform, x, y):
+    '''Applies a transform to a direction vector'''
+    swap, flip_x, flip_y = transform
+    if swap:
+        x, y = y, x
+    return -x if flip_x else x, -y if flip_y else y
+
+_VECTOR_DIRECTION = {(vector['x'], vector['y']): dir for dir, vector in DIRECTION.items()}
+
+# DIRECTION_MAPS[transform][direction] -> the direction it points in after the transform
+DIRECTION_MAPS = tuple(
+    {dir: _VECTOR_DIRECTION[_map_vector(transform, vector['x'], vector['y'])] for dir, vector in DIRECTION.items()}
+    for transform in TRANSFORMS
+)
+
+# {board size: square maps}, built on first use of each size
+_square_maps = {}
+
+
+def get_square_maps(size=BOARD_SIZE):
+    '''Returns maps[transform][square] -> square after the transform, on a board of the given size'''
+    if size not in _square_maps:
+        maps = []
+        for swap, flip_x, flip_y in TRANSFORMS:
+            squares = []
+            for x in range(size):
+                for y in range(size):
+                    new_x, new_y = (y, x) if swap else (x, y)
+                    new_x = size - 1 - new_x if flip_x else new_x
+                    new_y = size - 1 - new_y if flip_y else new_y
+                    squares.append(new_x * size + new_y)
+            maps.append(tuple(squares))
+        _square_maps[size] = tuple(maps)
+    return _square_maps[size]
+
+
+def transform_square(transform, square, size=BOARD_SIZE):
+    '''Returns the square (x * size + y) a square is mapped to by a transform'''
+    return get_square_maps(size)[transform][square]
+
+
+def transform_direction(transform, dir):
+    '''Returns the direction a move or build direction is mapped to by a transform.
+    DIRECTION_MAPS[INVERSE[transform]] maps it back'''
+    return DIRECTION_MAPS[transform][dir]
+
+
+def _map_heights(position, squares):
+    '''Returns the heights of a Position moved to the squares of a square map'''
+    heights = bytearray(len(position.heights))
+    for square, height in enumerate(position.heights):
+        heights[squares[square]] = height
+    return bytes(heights)
+
+
+def transform_position(position, transform):
+    '''Returns the Position mapped by a transform, with every worker keeping its name'''
+    squares = get_square_maps(position.size)[transform]
+    return Position(_map_heights(position, squares), bytes(squares[square] for square in position.workers),
+                    position.turn)
+
+
+def _form(position, transform):
+    '''Returns the (heights, worker squares) of a Position mapped by a transform, with each player's
+    two worker squares in ascending order, as the two workers of a player are interchangeable'''
+    squares = get_square_maps(position.size)[transform]
+    workers = [squares[square] for square in position.workers]
+    return _map_heights(position, squares), bytes(sorted(workers[:2]) + sorted(workers[2:]))
+
+
+def canonicalize_position(position):
+    '''Returns (canonical Position, transform into it). Positions that are rotations or reflections of each other,
+    or that differ only in which of a player's two workers stands where, share one canonical Position: the
+    transformed position with the smallest heights and worker squares, with each player's first worker (A or Y)
+    on the lower of its two squares'''
+    forms = [_form(position, transform) for transform in range(len(TRANSFORMS))]
+    transform = min(range(len(TRANSFORMS)), key=forms.__getitem__)
+    heights, workers = forms[transform]
+    return Position(heights, workers, position.turn), transform
+
+
+def canonicalize(game):
+    '''Returns (canonical Position, transform into it) of a GameState or GameManager'''
+    return canonicalize_position(Position.from_game_state(game))
+
+
+def symmetries(position):
+    '''Returns the transforms that map a Position onto itself, the identity first'''
+    identity = _form(position, IDENTITY)
+    return [transform for transform in range(len(TRANSFORMS)) if _form(position, transform) == identity]
+
+
+def unique_actions(position, actions):
+    '''Returns the (worker name, move square, build square) actions with symmetric duplicates removed:
+    of every group of actions that the position's own symmetries map onto each other, only the first is kept.
+    Order is preserved'''
+    transforms = symmetries(position)[1:]
+    if not transforms:
+        return list(actions)
+    maps = get_square_maps(position.size)
+    squares = dict(zip(WORKER_NAMES, position.workers))
+    names = dict(zip(position.workers, WORKER_NAMES))
+    unique = []
+    duplicates = set()
+    for action in actions:
+        if action in duplicates:
+            continue
+        unique.append(action)
+        worker_name, move_square, build_square = action
+        for transform in transforms:
+            squares_map = maps[transform]
+            duplicates.add((names[squares_map[squares[worker_name]]], squares_map[move_square],
+                            squares_map[build_square]))
+    return unique
+
+
+def _side_squares(position):
+    '''Returns the worker squares of the side to move, white on odd turns and blue on even turns'''
+    return position.workers[0:2] if position.turn % 2 == 1 else position.workers[2:4]
+
+
+def to_canonical_action(position, transform, action):
+    '''Maps an action code of the side to move in a Position to the same action in its canonical Position,
+    given the transform returned by canonicalize_position'''
+    worker_index, move_dir, build_dir = decode_action(action)
+    squares = get_square_maps(position.size)[transform]
+    own = _side_squares(position)
+    canonical_squares = sorted(squares[square] for square in own)
+    return encode_action(canonical_squares.index(squares[own[worker_index]]),
+                         DIRECTION_MAPS[transform][move_dir], DIRECTION_MAPS[transform][build_dir])
+
+
+def from_canonical_action(position, transform, action):
+    '''Maps an action code of the canonical Position back to the same action in a Position,
+    given the transform returned by canonicalize_position'''
+    worker_index, move_dir, build_dir = decode_action(action)
+    maps = get_square_maps(position.size)
+    inverse = INVERSE[transform]
+    own = _side_squares(position)
+    canonical_square = sorted(maps[transform][square] for square in own)[worker_index]
+    return encode_action(own.index(maps[inverse][canonical_square]),
+                         DIRECTION_MAPS[inverse][move_dir], DIRECTION_MAPS[inverse][build_dir])
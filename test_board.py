@@ -0,0 +1,52 @@
+'''Tests of the board's cached legal moves and mobility counts. Run with python -m unittest'''
+import random
+import unittest
+from game import GameManager
+from turn import RandomTurn
+
+
+class MoveCacheTest(unittest.TestCase):
+    '''The board's cached legal moves must match a fresh enumeration after every kind of board change'''
+    def assert_cache_matches(self, manager):
+        board = manager.get_board()
+        for player in manager.get_both_players():
+            for worker in player.get_workers():
+                self.assertEqual(worker.enumerate_moves(board), board.compute_legal_moves(worker.x, worker.y))
+                self.assertEqual(worker.no_moves_left(board), board.get_mobility(worker.name) == 0)
+
+    def test_moves_undo_redo_and_apply_undo(self):
+        for seed in range(60):
+            rng = random.Random(seed)
+            random.seed(seed)
+            manager = GameManager('random', 'random', True, size=rng.choice((5, 5, 6)))
+            game = manager.get_game_state()
+            for _ in range(200):
+                player = manager.alternate_player()
+                self.assert_cache_matches(manager)
+                if manager.get_winner(player) is not None:
+                    break
+                worker, move_dir, build_dir = RandomTurn(manager.get_board(), player, manager).select_move()
+                player.move(worker, move_dir)
+                self.assert_cache_matches(manager)
+                player.build(worker, build_dir)
+                manager.increment_turn_count()
+                self.assert_cache_matches(manager)
+
+                if rng.random() < 0.2 and manager.get_turncount() > 2:
+                    manager.undo()
+                    self.assert_cache_matches(manager)
+                    if rng.random() < 0.5:
+                        manager.redo()
+                        self.assert_cache_matches(manager)
+                if rng.random() < 0.2:
+                    actions = game.legal_actions()
+                    if actions and not game.get_board().win_condition_satisfied():
+                        action = rng.choice(actions)
+                        game.apply(action)
+                        self.assert_cache_matches(manager)
+                        game.undo(action)
+                        self.assert_cache_matches(manager)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+'''Tests of writing and reading opening books. Run with python -m unittest'''
+import os
+import random
+import tempfile
+import unittest
+from book import OpeningBook, write_book
+from game import GameManager
+from player import encode_action
+from position import Position
+from symmetry import canonicalize_position, to_canonical_action
+from turn import HeuristicTurn
+from zobrist import hash_position
+
+
+class OpeningBookTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'opening.book')
+
+    def open_book(self, entries, last_turn):
+        write_book(self.path, entries, last_turn)
+        book = OpeningBook(self.path)
+        self.addCleanup(book.close)
+        return book
+
+    def test_lookup(self):
+        entries = {key: key % 128 for key in (3, 2 ** 63, 17, 2 ** 64 - 1, 99)}
+        book = self.open_book(entries, 6)
+        self.assertEqual((len(book), book.last_turn), (5, 6))
+        for key, action in entries.items():
+            self.assertEqual(book.lookup(key), action)
+        self.assertIsNone(book.lookup(4))
+
+    def test_turns_past_the_book_are_not_looked_up(self):
+        def first_move(book):
+            # The heuristic breaks ties at random
+            random.seed(10)
+            manager = GameManager('heuristic', 'heuristic', opening_book=book)
+            player = manager.alternate_player()
+            worker, move_dir, build_dir = HeuristicTurn(manager.get_board(), player, manager).select_move()
+            return worker.name, move_dir, build_dir
+
+        manager = GameManager('heuristic', 'heuristic')
+        computed = first_move(None)
+        # Book a start move the heuristic would not play
+        player = manager.alternate_player()
+        worker = next(worker for worker in player.get_workers() if worker.name != computed[0])
+        move_dir = next(iter(worker.enumerate_moves(manager.get_board())))
+        build_dir = worker.enumerate_moves(manager.get_board())[move_dir][0]
+        position = Position.from_game_state(manager)
+        canonical, transform = canonicalize_position(position)
+        action = encode_action(player.get_workers().index(worker), move_dir, build_dir)
+        entries = {hash_position(canonical): to_canonical_action(position, transform, action)}
+
+        self.assertEqual(first_move(self.open_book(entries, 1)), (worker.name, move_dir, build_dir))
+        self.assertEqual(first_move(self.open_book(entries, 0)), computed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+'''Tests of GameState and GameManager. Run with python -m unittest'''
+import random
+import unittest
+from game import GameManager, GameState
+from position import Position
+from turn import RandomTurn
+from zobrist import EXACT, hash_board
+
+
+def play_random_turn(manager):
+    '''Plays one random turn through the players, as the CLI does. Returns False if the game has ended'''
+    player = manager.alternate_player()
+    if manager.get_winner(player) is not None:
+        return False
+    worker, move_dir, build_dir = RandomTurn(manager.get_board(), player, manager).select_move()
+    player.move(worker, move_dir)
+    player.build(worker, build_dir)
+    manager.increment_turn_count()
+    return True
+
+
+class ApplyUndoTest(unittest.TestCase):
+    '''apply must keep the incremental hash equal to a fresh one, and undo must restore the state exactly'''
+    def assert_hash_fresh(self, game):
+        self.assertEqual(game.get_hash(), hash_board(game.get_board(), game.get_turncount() % 2 == 0))
+
+    def test_apply_undo_restores_position_and_hash(self):
+        rng = random.Random(14)
+        for size in (5, 6):
+            for _ in range(10):
+                game = GameState('random', 'random', False, False, None, size=size)
+                while True:
+                    actions = game.legal_actions()
+                    if not actions or game.get_board().win_condition_satisfied():
+                        break
+                    position, key = Position.from_game_state(game), game.get_hash()
+                    for action in actions:
+                        game.apply(action)
+                        self.assert_hash_fresh(game)
+                        game.undo(action)
+                        self.assertEqual(Position.from_game_state(game), position)
+                        self.assertEqual(game.get_hash(), key)
+                    game.apply(rng.choice(actions))
+
+    def test_workers_follow_apply_and_undo(self):
+        game = GameState('random', 'random', False, False, None)
+        for action in game.legal_actions():
+            game.apply(action)
+            for player in game.get_players():
+                for worker in player.get_workers():
+                    self.assertEqual(game.get_board().get_specific_cell(worker.x, worker.y).get_occupying_worker(),
+                                     worker.name)
+            game.undo(action)
+
+
+class ResetTest(unittest.TestCase):
+    '''A manager reset after a game must be indistinguishable from a fresh one'''
+    def test_reset_matches_fresh_manager(self):
+        for size in (5, 6):
+            random.seed(size)
+            fresh = GameManager('random', 'random', True, size=size)
+            manager = GameManager('random', 'random', True, size=size)
+            for player in manager.get_both_players():
+                manager.get_transposition_table(player).store(manager.get_hash(), 1, EXACT, 0, None)
+            while play_random_turn(manager):
+                pass
+            manager.undo()
+            manager.reset()
+
+            self.assertEqual(Position.from_game_state(manager), Position.from_game_state(fresh))
+            self.assertEqual(manager.get_hash(), fresh.get_hash())
+            self.assertEqual(manager.get_turncount(), 1)
+            self.assertFalse(manager.undo())
+            self.assertFalse(manager.redo())
+            board, fresh_board = manager.get_board(), fresh.get_board()
+            for player in manager.get_both_players():
+                self.assertEqual(len(manager.get_transposition_table(player)), 0)
+                for worker in player.get_workers():
+                    self.assertEqual(board.get_legal_moves(worker.name, worker.x, worker.y),
+                                     fresh_board.get_legal_moves(worker.name, worker.x, worker.y))
+                    self.assertEqual(board.get_mobility(worker.name), fresh_board.get_mobility(worker.name))
+            self.assertEqual(sorted(manager.get_game_state().legal_actions()),
+                             sorted(fresh.get_game_state().legal_actions()))
+
+
+if __name__ == '__main__':
+    unittest.main()
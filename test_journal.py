@@ -0,0 +1,86 @@
+'''Tests of restoring positions from a game journal. Run with python -m unittest'''
+import os
+import random
+import tempfile
+import unittest
+from game import GameManager
+from journal import GameJournal, load_state
+from position import Position
+from turn import RandomTurn
+from zobrist import hash_position
+
+
+def play_random_turn(manager):
+    '''Plays one random turn through the players, as the CLI does. Returns False if the game has ended'''
+    player = manager.alternate_player()
+    if manager.get_winner(player) is not None:
+        return False
+    worker, move_dir, build_dir = RandomTurn(manager.get_board(), player, manager).select_move()
+    player.move(worker, move_dir)
+    player.build(worker, build_dir)
+    manager.increment_turn_count()
+    return True
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'game.journal')
+
+    def test_load_state_at_every_turn(self):
+        random.seed(4)
+        journal = GameJournal(self.path, interval=3)
+        manager = GameManager('random', 'heuristic', journal=journal, size=6)
+        positions = {1: Position.from_game_state(manager)}
+        while play_random_turn(manager):
+            positions[manager.get_turncount()] = Position.from_game_state(manager)
+        journal.close()
+
+        for turn, position in positions.items():
+            state = load_state(self.path, turn)
+            self.assertEqual(Position.from_game_state(state), position)
+            self.assertEqual(state.get_hash(), hash_position(position))
+        with self.assertRaises(ValueError):
+            load_state(self.path, max(positions) + 1)
+
+    def test_load_state_follows_the_line_played_after_undo(self):
+        random.seed(5)
+        journal = GameJournal(self.path, interval=2)
+        manager = GameManager('random', 'random', True, journal=journal)
+        for _ in range(6):
+            play_random_turn(manager)
+        manager.undo()
+        manager.undo()
+        positions = {manager.get_turncount(): Position.from_game_state(manager)}
+        for _ in range(3):
+            play_random_turn(manager)
+            positions[manager.get_turncount()] = Position.from_game_state(manager)
+        journal.close()
+
+        for turn, position in positions.items():
+            self.assertEqual(Position.from_game_state(load_state(self.path, turn)), position)
+
+    def test_each_game_of_a_session_has_its_own_journal(self):
+        random.seed(6)
+        journal = GameJournal(self.path, interval=4)
+        manager = GameManager('random', 'random', journal=journal)
+        games = []
+        for game in range(3):
+            if game:
+                manager.reset()
+            positions = {1: Position.from_game_state(manager)}
+            while play_random_turn(manager):
+                positions[manager.get_turncount()] = Position.from_game_state(manager)
+            games.append(positions)
+        journal.close()
+
+        self.assertEqual([journal.game_path(number) for number in (1, 2, 3)],
+                         [self.path, self.path + '.2', self.path + '.3'])
+        for number, positions in enumerate(games, 1):
+            for turn, position in positions.items():
+                self.assertEqual(Position.from_game_state(load_state(journal.game_path(number), turn)), position)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+'''Tests of undo and redo through the per-turn mementos. Run with python -m unittest'''
+import random
+import unittest
+from game import GameManager
+from position import Position
+from turn import RandomTurn
+
+
+def play_random_turn(manager):
+    '''Plays one random turn through the players, as the CLI does. Returns False if the game has ended'''
+    player = manager.alternate_player()
+    if manager.get_winner(player) is not None:
+        return False
+    worker, move_dir, build_dir = RandomTurn(manager.get_board(), player, manager).select_move()
+    player.move(worker, move_dir)
+    player.build(worker, build_dir)
+    manager.increment_turn_count()
+    return True
+
+
+class MementoTest(unittest.TestCase):
+    def assert_position(self, manager, position):
+        '''Checks the board, turn count, workers and hash against a position'''
+        self.assertEqual(Position.from_game_state(manager), position)
+        for player in manager.get_both_players():
+            for worker in player.get_workers():
+                self.assertEqual(manager.get_board().get_specific_cell(worker.x, worker.y).get_occupying_worker(),
+                                 worker.name)
+
+    def test_undo_and_redo_walk_the_history(self):
+        for seed in range(20):
+            random.seed(seed)
+            manager = GameManager('random', 'random', True)
+            positions = [Position.from_game_state(manager)]
+            hashes = [manager.get_hash()]
+            while play_random_turn(manager):
+                positions.append(Position.from_game_state(manager))
+                hashes.append(manager.get_hash())
+
+            # Undo back to the start, then redo to the end
+            for position, key in zip(reversed(positions[:-1]), reversed(hashes[:-1])):
+                self.assertTrue(manager.undo())
+                self.assert_position(manager, position)
+                self.assertEqual(manager.get_hash(), key)
+            self.assertFalse(manager.undo())
+            for position, key in zip(positions[1:], hashes[1:]):
+                self.assertTrue(manager.redo())
+                self.assert_position(manager, position)
+                self.assertEqual(manager.get_hash(), key)
+            self.assertFalse(manager.redo())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+'''Tests of the move generator's leaf counts. Run with python -m unittest'''
+import unittest
+from board import BitBoard
+from game import GameState
+from perft import perft, perft_bitboard
+
+
+class PerftTest(unittest.TestCase):
+    '''Leaf counts from the starting position'''
+    COUNTS = {1: 80, 2: 6176, 3: 426384}
+
+    def test_start_position(self):
+        game = GameState('random', 'random', False, False, None)
+        for depth, nodes in self.COUNTS.items():
+            self.assertEqual(perft(game, depth), nodes)
+
+    def test_bitboard_agrees(self):
+        game = GameState('random', 'random', False, False, None)
+        bitboard = BitBoard.from_board(game.get_board())
+        for depth, nodes in self.COUNTS.items():
+            self.assertEqual(perft_bitboard(bitboard, ('A', 'B'), ('Y', 'Z'), depth), nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()
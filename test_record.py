@@ -0,0 +1,73 @@
+'''Tests of writing and reading game record files. Run with python -m unittest'''
+import os
+import tempfile
+import unittest
+from game import GameManager
+from record import MAX_SEED, GameRecord, RecordWriter, parse_seed, read_records
+from simulate import play_game, simulate
+
+
+class RecordTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'games.snr')
+
+    def test_round_trip(self):
+        records = [GameRecord('heuristic', 'random', 0, bytes([0, 9, 127, 64]), 'white'),
+                   GameRecord('mcts', 'search', MAX_SEED, b'', None),
+                   GameRecord('human', 'random', 12345, bytes(range(128)), 'blue')]
+        with RecordWriter(self.path) as writer:
+            for record in records:
+                writer.write(record)
+
+        read = list(read_records(self.path))
+        self.assertEqual(len(read), len(records))
+        for record, copy in zip(records, read):
+            self.assertEqual((copy.playerWhite_type, copy.playerBlue_type, copy.seed, bytes(copy.actions),
+                              copy.winner),
+                             (record.playerWhite_type, record.playerBlue_type, record.seed, bytes(record.actions),
+                              record.winner))
+
+    def test_recorded_game_replays_to_its_winner(self):
+        for seed in range(5):
+            winner, turns, actions = play_game('heuristic', 'random', seed)
+            with RecordWriter(self.path) as writer:
+                writer.write(GameRecord('heuristic', 'random', seed, actions, winner))
+            record, = read_records(self.path)
+            self.assertEqual(len(record), turns)
+
+            manager = GameManager('heuristic', 'random')
+            for action in record.actions:
+                manager.get_game_state().apply(action)
+            self.assertEqual(manager.get_winner(manager.alternate_player()), record.winner)
+            # Turns alternate between white's workers and blue's
+            for turn, (name, _, _) in enumerate(record.turns()):
+                self.assertIn(name, 'AB' if turn % 2 == 0 else 'YZ')
+
+    def test_rejects_seeds_outside_the_header(self):
+        with RecordWriter(self.path) as writer:
+            for seed in (-1, MAX_SEED + 1):
+                with self.assertRaises(ValueError):
+                    writer.write(GameRecord('random', 'random', seed, b''))
+        for text in ('-1', str(MAX_SEED + 1), 'seven'):
+            with self.assertRaises(ValueError):
+                parse_seed(text)
+        self.assertEqual(parse_seed(str(MAX_SEED)), MAX_SEED)
+
+    def test_simulation_rejects_seeds_past_the_header_before_playing(self):
+        with self.assertRaises(ValueError):
+            simulate('random', 'random', 3, jobs=1, seed=MAX_SEED - 1, record_path=self.path)
+        self.assertFalse(os.path.exists(self.path))
+        simulate('random', 'random', 2, jobs=1, seed=MAX_SEED - 1, record_path=self.path)
+        self.assertEqual([record.seed for record in read_records(self.path)], [MAX_SEED - 1, MAX_SEED])
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'JUNK\x01')
+        with self.assertRaises(ValueError):
+            list(read_records(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+'''Tests of the board symmetries and canonical positions. Run with python -m unittest'''
+import random
+import unittest
+from game import GameState
+from position import Position
+from symmetry import (DIRECTION_MAPS, INVERSE, TRANSFORMS, canonicalize, canonicalize_position,
+                      from_canonical_action, to_canonical_action, transform_position)
+
+
+def play_random_actions(game, rng, turns):
+    '''Plays up to the given number of random legal actions on a GameState, stopping at the end of the game'''
+    for _ in range(turns):
+        actions = game.legal_actions()
+        if not actions or game.get_board().win_condition_satisfied():
+            return
+        game.apply(rng.choice(actions))
+
+
+class SymmetryTest(unittest.TestCase):
+    '''Positions and actions must survive a round trip through their canonical form'''
+    def test_inverse_transforms(self):
+        for transform in range(len(TRANSFORMS)):
+            self.assertEqual(INVERSE[INVERSE[transform]], transform)
+            for dir, mapped in DIRECTION_MAPS[transform].items():
+                self.assertEqual(DIRECTION_MAPS[INVERSE[transform]][mapped], dir)
+
+    def test_canonical_round_trips(self):
+        rng = random.Random(3)
+        for size in (4, 5, 6):
+            for _ in range(25):
+                game = GameState('random', 'random', False, False, None, size=size)
+                play_random_actions(game, rng, rng.randrange(20))
+                actions = game.legal_actions()
+                if not actions:
+                    continue
+                position = Position.from_game_state(game)
+                canonical, transform = canonicalize_position(position)
+                self.assertEqual(transform_position(position, transform).heights, canonical.heights)
+
+                # Every transform of the position, with or without its workers swapped, has the same canonical form
+                for other in range(len(TRANSFORMS)):
+                    transformed = transform_position(position, other)
+                    workers = transformed.workers
+                    swapped = Position(transformed.heights, bytes((workers[1], workers[0], workers[3], workers[2])),
+                                       transformed.turn)
+                    self.assertEqual(canonicalize_position(transformed)[0], canonical)
+                    self.assertEqual(canonicalize_position(swapped)[0], canonical)
+
+                # Every action maps to a legal canonical action that leads to the same canonical position
+                canonical_game = GameState('random', 'random', False, False, None, size=size)
+                canonical.restore(canonical_game)
+                for action in actions:
+                    canonical_action = to_canonical_action(position, transform, action)
+                    self.assertEqual(from_canonical_action(position, transform, canonical_action), action)
+                    self.assertIn(canonical_action, canonical_game.legal_actions())
+                    canonical_game.apply(canonical_action)
+                    game.apply(action)
+                    self.assertEqual(canonicalize(canonical_game)[0], canonicalize(game)[0])
+                    game.undo(action)
+                    canonical_game.undo(canonical_action)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+'''Tests of the vectorized environment against GameState. Run with python -m unittest'''
+import random
+import unittest
+from game import GameManager
+
+try:
+    import numpy as np
+    from vecenv import VecEnv
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "VecEnv requires NumPy")
+class VecEnvTest(unittest.TestCase):
+    '''VecEnv's legal action masks and winners must match GameState played alongside it'''
+    def test_matches_game_state(self):
+        for size in (5, 6):
+            rng = random.Random(size)
+            env = VecEnv(30, size)
+            managers = [GameManager('random', 'random', size=size) for _ in range(30)]
+            while not env.done().all():
+                mask = env.legal_mask()
+                actions = np.zeros(len(managers), dtype=int)
+                for i, manager in enumerate(managers):
+                    player = manager.alternate_player()
+                    if env.done()[i]:
+                        continue
+                    self.assertIsNone(manager.get_winner(player))
+                    legal = sorted(manager.get_game_state().legal_actions())
+                    self.assertEqual(legal, np.flatnonzero(mask[i]).tolist())
+                    actions[i] = rng.choice(legal)
+                    manager.get_game_state().apply(int(actions[i]))
+                env.step(actions)
+            for i, manager in enumerate(managers):
+                self.assertEqual(manager.get_winner(manager.alternate_player()), ['white', 'blue'][env.winners[i]])
+
+
+if __name__ == '__main__':
+    unittest.main()
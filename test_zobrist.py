@@ -0,0 +1,73 @@
+'''Tests of the transposition table's storage and replacement policies. Run with python -m unittest'''
+import unittest
+from zobrist import EXACT, LOWER, UPPER, TranspositionTable
+
+
+def table_of(entries, replacement):
+    '''Returns a table that holds the given number of entries'''
+    return TranspositionTable(max_bytes=entries * TranspositionTable.ENTRY_BYTES, replacement=replacement)
+
+
+class TranspositionTableTest(unittest.TestCase):
+    def test_stored_entry_is_returned(self):
+        for replacement in ('lru', 'depth'):
+            table = table_of(16, replacement)
+            table.store(7, 3, LOWER, -12, ('A', 6, 11))
+            table.store(8, 1, EXACT, 4.5, None)
+            self.assertEqual(table.get(7), (3, LOWER, -12, ('A', 6, 11)))
+            self.assertEqual(table.get(8), (1, EXACT, 4.5, None))
+            self.assertIsNone(table.get(9))
+            self.assertEqual((table.hits, table.misses), (2, 1))
+
+    def test_lru_evicts_least_recently_used(self):
+        table = table_of(3, 'lru')
+        for key in (1, 2, 3):
+            table.store(key, 1, EXACT, key, None)
+        # Reading key 1 makes key 2 the least recently used
+        table.get(1)
+        table.store(4, 1, EXACT, 4, None)
+        self.assertIsNone(table.get(2))
+        for key in (1, 3, 4):
+            self.assertIsNotNone(table.get(key))
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.evictions, 1)
+
+    def test_lru_overwrites_same_key(self):
+        table = table_of(2, 'lru')
+        table.store(1, 1, UPPER, 5, None)
+        table.store(1, 4, EXACT, 6, ('Y', 1, 2))
+        self.assertEqual(table.get(1), (4, EXACT, 6, ('Y', 1, 2)))
+        self.assertEqual((len(table), table.evictions), (1, 0))
+
+    def test_depth_keeps_deeper_entry_of_a_slot(self):
+        table = table_of(8, 'depth')
+        capacity = table.stats()['capacity']
+        shallow, deep = 5, 5 + capacity
+        table.store(deep, 6, EXACT, 1, None)
+        # A shallower result for another key in the same slot is dropped
+        table.store(shallow, 2, EXACT, 2, None)
+        self.assertIsNone(table.get(shallow))
+        self.assertEqual(table.get(deep), (6, EXACT, 1, None))
+        # A result at least as deep replaces it
+        table.store(shallow, 6, EXACT, 3, None)
+        self.assertIsNone(table.get(deep))
+        self.assertEqual(table.get(shallow), (6, EXACT, 3, None))
+        self.assertEqual(table.evictions, 1)
+
+    def test_clear_keeps_counters(self):
+        for replacement in ('lru', 'depth'):
+            table = table_of(4, replacement)
+            table.store(1, 1, EXACT, 0, None)
+            table.get(1)
+            table.clear()
+            self.assertEqual(len(table), 0)
+            self.assertIsNone(table.get(1))
+            self.assertEqual((table.stores, table.hits, table.misses), (1, 1, 1))
+
+    def test_unknown_replacement_policy(self):
+        with self.assertRaises(ValueError):
+            TranspositionTable(replacement='fifo')
+
+
+if __name__ == '__main__':
+    unittest.main()
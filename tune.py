@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from player import DEFAULT_WEIGHTS, parse_weights
+from simulate import play_games
+
+INITIAL_ELO = 1500
+# Elo change for a whole match, applied to the match score (fraction of games won) rather than per game, so a
+# rating moves by less than ELO_K per match however many games it has and does not depend on game order
+ELO_K = 64
+
+
+def weights_key(weights):
+    '''Returns the "h,c,d" text of a weight vector, as accepted by parse_weights'''
+    return ','.join(f'{weight:g}' for weight in weights)
+
+
+def play_match(weights, opponent_weights, seeds):
+    '''Plays heuristic players with the two weight vectors against each other, once with each color per seed.
+    Returns the number of games won by weights'''
+    wins = 0
+    for winner, _, _ in play_games('heuristic', 'heuristic', seeds, white_weights=weights,
+                                   blue_weights=opponent_weights):
+        wins += winner == 'white'
+    for winner, _, _ in play_games('heuristic', 'heuristic', seeds, white_weights=opponent_weights,
+                                   blue_weights=weights):
+        wins += winner == 'blue'
+    return wins
+
+
+def update_elo(ratings, weights, opponent_weights, wins, games):
+    '''Updates {weights key: Elo} with the result of a match of the given number of games, treating the match
+    as a single result scored by the fraction of games won'''
+    key, opponent_key = weights_key(weights), weights_key(opponent_weights)
+    rating = ratings.get(key, INITIAL_ELO)
+    opponent_rating = ratings.get(opponent_key, INITIAL_ELO)
+    expected = 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+    delta = ELO_K * (wins / games - expected)
+    ratings[key] = rating + delta
+    ratings[opponent_key] = opponent_rating - delta
+
+
+class CoordinateSearch:
+    '''Tunes heuristic weights by coordinate search. Each pass plays the current weights against every weight
+    vector one step away along one coordinate, on fresh seeds, and moves to the candidate that beat them by more
+    than the margin. A pass without such a candidate halves the step; the search ends below the minimum step'''
+    def __init__(self, weights=DEFAULT_WEIGHTS, step=1.0, min_step=0.125, games=100, margin=0.05, seed=0):
+        self.weights = tuple(weights)
+        self.step = step
+        self.min_step = min_step
+        self.games = games
+        self.margin = margin
+        self.seed = seed
+        self.passes = 0
+        self.ratings = {weights_key(weights): INITIAL_ELO}
+        self.history = []
+
+    def done(self):
+        '''Returns True once the step has shrunk below the minimum step'''
+        return self.step < self.min_step
+
+    def candidates(self):
+        '''Returns every non-negative weight vector one step away from the current weights along one coordinate'''
+        candidates = []
+        for index in range(len(self.weights)):
+            for sign in (1, -1):
+                candidate = list(self.weights)
+                candidate[index] = round(candidate[index] + sign * self.step, 6)
+                if candidate[index] >= 0:
+                    candidates.append(tuple(candidate))
+        return candidates
+
+    def run_pass(self, executor=None, chunk_size=25):
+        '''Plays one pass of matches, across the executor if one is given, and moves or shrinks the step.
+        Returns (best candidate, its win rate against the current weights)'''
+        first_seed = self.seed + self.passes * self.games
+        seeds = list(range(first_seed, first_seed + self.games))
+        chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+        candidates = self.candidates()
+
+        if executor is None:
+            wins = [sum(play_match(candidate, self.weights, chunk) for chunk in chunks) for candidate in candidates]
+        else:
+            futures = [[executor.submit(play_match, candidate, self.weights, chunk) for chunk in chunks]
+                       for candidate in candidates]
+            wins = [sum(future.result() for future in candidate_futures) for candidate_futures in futures]
+
+        # Every game is played once with each color
+        games = 2 * self.games
+        for candidate, candidate_wins in zip(candidates, wins):
+            update_elo(self.ratings, candidate, self.weights, candidate_wins, games)
+
+        best_wins, best_candidate = max(zip(wins, candidates))
+        win_rate = best_wins / games
+        self.history.append({'pass': self.passes, 'weights': weights_key(self.weights), 'step': self.step,
+                             'candidate': weights_key(best_candidate), 'win_rate': win_rate})
+        if win_rate > 0.5 + self.margin:
+            self.weights = best_candidate
+        else:
+            self.step /= 2
+        self.passes += 1
+        return best_candidate, win_rate
+
+    def save(self, path):
+        '''Writes the search state to a JSON checkpoint, replacing any previous checkpoint atomically'''
+        state = {
+            'weights': list(self.weights), 'step': self.step, 'min_step': self.min_step, 'games': self.games,
+            'margin': self.margin, 'seed': self.seed, 'passes': self.passes, 'ratings': self.ratings,
+            'history': self.history,
+        }
+        with open(path + '.tmp', 'w') as file:
+            json.dump(state, file, indent=2)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path):
+        '''Returns the search saved in a JSON checkpoint'''
+        with open(path) as file:
+            state = json.load(file)
+        search = cls(state['weights'], state['step'], state['min_step'], state['games'], state['margin'],
+                     state['seed'])
+        search.passes = state['passes']
+        search.ratings = state['ratings']
+        search.history = state['history']
+        return search
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tune the heuristic player's weights with self-play tournaments")
+    parser.add_argument('--checkpoint', metavar='FILE', default='tune.json',
+                        help="JSON checkpoint written after every pass and resumed from if it exists "
+                             "(default: tune.json)")
+    parser.add_argument('--weights', type=parse_weights, default=DEFAULT_WEIGHTS,
+                        help="starting weights as h,c,d (default: 3,2,1)")
+    parser.add_argument('--step', type=float, default=1.0, help="starting step size (default: 1)")
+    parser.add_argument('--min-step', type=float, default=0.125, help="step size to stop at (default: 0.125)")
+    parser.add_argument('-n', '--games', type=int, default=100,
+                        help="games per color in every match (default: 100)")
+    parser.add_argument('--margin', type=float, default=0.05,
+                        help="win rate above 0.5 a candidate needs to be accepted (default: 0.05)")
+    parser.add_argument('--passes', type=int, default=None, help="stop after this many passes in this run")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="number of processes (default: one per CPU)")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game")
+    args = parser.parse_args()
+
+    if os.path.exists(args.checkpoint):
+        search = CoordinateSearch.load(args.checkpoint)
+        print(f"Resuming from {args.checkpoint} at pass {search.passes}, weights {weights_key(search.weights)}")
+    else:
+        search = CoordinateSearch(args.weights, args.step, args.min_step, args.games, args.margin, args.seed)
+
+    executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs != 1 else None
+    try:
+        passes = 0
+        while not search.done() and (args.passes is None or passes < args.passes):
+            weights = search.weights
+            candidate, win_rate = search.run_pass(executor)
+            search.save(args.checkpoint)
+            passes += 1
+            print(f"Pass {search.passes}: {weights_key(candidate)} vs {weights_key(weights)} won {win_rate:.3f}, "
+                  f"weights now {weights_key(search.weights)}, step {search.step:g}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print(f"Weights: {weights_key(search.weights)} (Elo {search.ratings.get(weights_key(search.weights), INITIAL_ELO):.0f})")
+    print(f"Play them with: python main.py heuristic heuristic --white-weights {weights_key(search.weights)}")
@@ -1,5 +1,45 @@
 import random
-from player import DIRECTION
+import time
+from player import DIRECTION, BOARD_SIZE, decode_action
+from board import BitBoard, SQUARE_DIRECTION
+from search import AlphaBetaSearch
+from mcts import parallel_search
+from position import Position
+from symmetry import canonicalize_position, from_canonical_action, unique_actions
+from zobrist import hash_position
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# {board size: ring levels as a NumPy array}, built on first use of each size
+_ring_level_arrays = {}
+
+# {board size: Chebyshev distances between squares as a NumPy array}, built on first use of each size
+_distance_arrays = {}
+
+# Seconds of a move budget kept back for returning the move: this, or a quarter of budgets under 40 ms
+DEADLINE_MARGIN = 0.01
+
+# Candidates a heuristic turn scores between deadline checks when it has a budget
+DEADLINE_CHUNK = 16
+
+
+class Decision:
+    '''A move chosen within a time budget: the (worker, move direction, build direction), or None if the player
+    cannot move, the budget and elapsed time in seconds, whether the turn stopped early at its deadline, and the
+    (height, center, distance) scores of the move for turns that score their moves, else None'''
+    def __init__(self, move, budget, elapsed, cut_short, scores=None):
+        self.move = move
+        self.budget = budget
+        self.elapsed = elapsed
+        self.cut_short = cut_short
+        self.scores = scores
+
+    def budget_used(self):
+        '''Returns the fraction of the budget the turn used'''
+        return self.elapsed / self.budget if self.budget > 0 else 1.0
 
 
 class TurnTemplate:
@@ -12,6 +52,64 @@ class TurnTemplate:
     def run(self):
         raise NotImplementedError("Subclasses must implement the run method.")
 
+    def select_move(self):
+        '''Returns the (worker, move direction, build direction) this turn would play without playing it,
+        within the game's move budget if it has one. Only implemented by computer-controlled turns'''
+        return self._choose_move()[0]
+
+    def _choose_move(self):
+        '''Returns (move, scores) as held by a Decision, within the game's move budget if it has one'''
+        budget = self._manager.get_move_budget()
+        if budget is not None:
+            decision = self.decide(budget)
+            return decision.move, decision.scores
+        move, _, scores = self._select_move_by(None)
+        return move, scores
+
+    def decide(self, budget):
+        '''Returns a Decision holding the best move found within budget seconds. The turn stops searching at a
+        deadline a small margin before the budget runs out, so a legal move always comes back within the budget.
+        The fraction of the budget used is recorded by the game's profiler'''
+        start = time.perf_counter()
+        move, cut_short, scores = self._select_move_by(start + budget - min(DEADLINE_MARGIN, budget / 4))
+        elapsed = time.perf_counter() - start
+        decision = Decision(move, budget, elapsed, cut_short, scores)
+        self._manager.get_profiler().record_budget(self._player.type, decision.budget_used())
+        return decision
+
+    def _select_move_by(self, deadline):
+        '''Returns (move, True if it stopped early, scores) with the best move found before the deadline, a
+        time.perf_counter() value, or without a deadline if it is None. Scores are as held by a Decision'''
+        raise NotImplementedError("Computer-controlled turns must implement the _select_move_by method.")
+
+    def _book_move(self):
+        '''Returns the opening book's (worker, move direction, build direction) for the current position,
+        or None if there is no book, the game is past the book's last turn, the position is not in it, or the stored
+        action is not legal here. The book is keyed by canonical position, so rotations and reflections of a book
+        position are found too'''
+        book = self._manager.get_opening_book()
+        if book is None or self._manager.get_turncount() > book.last_turn:
+            return None
+        position = Position.from_game_state(self._manager)
+        canonical, transform = canonicalize_position(position)
+        action = book.lookup(hash_position(canonical))
+        if action is None:
+            return None
+        worker_index, move_dir, build_dir = decode_action(from_canonical_action(position, transform, action))
+        worker = self._player.get_workers()[worker_index]
+        # Guard against hash collisions by checking the action is legal
+        if build_dir not in worker.enumerate_moves(self._board).get(move_dir, []):
+            return None
+        return worker, move_dir, build_dir
+
+    def _display_move(self, worker, move_dir, build_dir):
+        '''Prints the move that was just played, with the player's current scores if score display is on'''
+        data = self._manager.get_curr_move_data(self._player)
+        if self._manager.get_scoredisplay() == True:
+            print(f"{worker.name},{move_dir},{build_dir} ({data[0]}, {data[1]}, {data[2]})")
+        else:
+            print(f"{worker.name},{move_dir},{build_dir}")
+
 
 class HumanTurn(TurnTemplate):
     '''Takes user input to decide what worker to use and what direction to move/build to'''
@@ -62,16 +160,33 @@ class HumanTurn(TurnTemplate):
                 print(f"Cannot build {build_dir}")
 
         # Print move data
-        data = self._manager.get_curr_move_data(self._player)
-        if self._manager.get_scoredisplay() == True:
-            print(f"{worker.name},{move_dir},{build_dir} ({data[0]}, {data[1]}, {data[2]})")
-        else:
-            print(f"{worker.name},{move_dir},{build_dir}")
+        self._display_move(worker, move_dir, build_dir)
 
 
 class RandomTurn(TurnTemplate):
     '''Randomly decides which worker to use, where to move, and where to build to'''
     def run(self):
+        move = self.select_move()
+
+        # If neither worker can move, end the game
+        if move is None:
+            self._manager.notify("end")
+            return
+        worker, move_dir, build_dir = move
+
+        # Move and build in that given direction
+        self._player.move(worker, move_dir)
+        self._player.build(worker, build_dir)
+
+        # Print move stats
+        self._display_move(worker, move_dir, build_dir)
+
+    def _select_move_by(self, deadline):
+        '''Returns a random (worker, move direction, build direction), or None if neither worker can move.
+        Picking a move takes no noticeable time, so the deadline is never reached'''
+        return self._random_move(), False, None
+
+    def _random_move(self):
         # Randomly choose worker
         worker = random.choice(self._player.get_workers())
 
@@ -88,42 +203,26 @@ class RandomTurn(TurnTemplate):
                 worker = workers[0]
             # Get other worker's possible moves
             worker_moves = worker.enumerate_moves(self._board)
-            # If other worker also has no moves left, end the game
+            # If other worker also has no moves left, there is no move to make
             if worker_moves == {}:
-                self._manager.notify("end")
-                return
+                return None
+
+        self._manager.get_profiler().count_candidates('random', sum(len(builds) for builds in worker_moves.values()))
 
         # Randomly choose move direction, represented by the keys in the dictionary
         move_dir = random.choice(list(worker_moves.keys()))
 
         # Randomly choose build direction, represented by the values of the move direction key
         build_dir = random.choice(worker_moves[move_dir])
-        
-        # Move and build in that given direction
-        self._player.move(worker, move_dir)
-        self._player.build(worker, build_dir)
 
-        # Print move stats
-        data = self._manager.get_curr_move_data(self._player)
-        if self._manager.get_scoredisplay() == True:
-            print(f"{worker.name},{move_dir},{build_dir} ({data[0]}, {data[1]}, {data[2]})")
-        else:
-            print(f"{worker.name},{move_dir},{build_dir}")
+        return worker, move_dir, build_dir
 
 
 class HeuristicTurn(TurnTemplate):
     '''Calculates move score based on certain critera and moves worker that has the highest move score'''
     def run(self):
-        # Get list containing the best move data
-        best_move_data = self.get_best_move_data()
-
-        # Assign corresponding data points in list to variables
-        worker = best_move_data[0]
-        move_dir = best_move_data[1]
-        build_dir = best_move_data[2]
-        height_score = best_move_data[3]
-        center_score = best_move_data[4]
-        distance_score = best_move_data[5]
+        # Choose the best move and its scores, within the game's move budget if it has one
+        (worker, move_dir, build_dir), (height_score, center_score, distance_score) = self._choose_move()
 
         # Move player in best direction, build in best direction
         self._player.move(worker, move_dir)
@@ -135,75 +234,153 @@ class HeuristicTurn(TurnTemplate):
         else:
             print(f"{worker.name},{move_dir},{build_dir}")
 
+    def _select_move_by(self, deadline):
+        '''Returns the (worker, move direction, build direction) with the highest move score among the
+        candidates scored before the deadline, with its (height, center, distance) scores. The move and scores
+        are None if the player cannot move'''
+        best_move_data, cut_short = self._best_move_data_by(deadline)
+        if best_move_data is None:
+            return None, cut_short, None
+        return tuple(best_move_data[:3]), cut_short, tuple(best_move_data[3:])
+
     def get_best_move_data(self):
         '''Iterates through every possible move and corresponding build direction and finds
         which combination would yield the highest move score. Returns a list containing the best
-        worker to move, move direction, build direction, and height/center/distance scores'''
+        worker to move, move direction, build direction, and height/center/distance scores,
+        or None if the player cannot move'''
+        return self._best_move_data_by(None)[0]
+
+    def _best_move_data_by(self, deadline):
+        '''Returns (best move data as in get_best_move_data, True if it stopped early), or (None, False) if the
+        player has no legal moves. With a deadline, candidates are scored DEADLINE_CHUNK at a time and the search
+        stops at the first chunk that ends past it'''
+
+        # Play straight from the opening book when the position is in it
+        book_move = self._book_move()
+        if book_move is not None:
+            worker, move_dir, build_dir = book_move
+            move_x = worker.x + DIRECTION[move_dir]['x']
+            move_y = worker.y + DIRECTION[move_dir]['y']
+            return [worker, move_dir, build_dir,
+                    self._calculate_height_score(worker, move_x, move_y),
+                    self._calculate_center_score(worker, move_x, move_y),
+                    self._calculate_distance_score(worker, move_x, move_y)], False
 
         # Get current player's workers
         workers = self._player.get_workers()
 
-        # Initialize lists to keep track of best scores
-        move_scores = []
-        move_list = []
-        best_moves_list = []
+        # Collect every (worker, move direction, build direction, move x, move y) candidate
+        candidates = []
 
         # For each worker get all possible moves and corresponding build directions
         for worker in workers:
             worker_moves = worker.enumerate_moves(self._board)
             # For each possible move direction and for each possible build direction tied to the move direction..
             for move_dir in worker_moves.keys():
+                # Calculate where the new x/y coords would be and get that cell
+                move_x = worker.x + DIRECTION[move_dir]['x']
+                move_y = worker.y + DIRECTION[move_dir]['y']
+                move_to_cell = self._board.get_specific_cell(move_x, move_y)
                 for build_dir in worker_moves[move_dir]:
-                    # Calculate where the new x/y coords would be and get that cell
-                    move_x = worker.x + DIRECTION[move_dir]['x']
-                    move_y = worker.y + DIRECTION[move_dir]['y']
-                    build_x = move_x + DIRECTION[build_dir]['x']
-                    build_y = move_y + DIRECTION[build_dir]['y']
-                    move_to_cell = self._board.get_specific_cell(move_x, move_y)
-
                     # If the cell being moved to has a height of 3, don't perform any calculations,
                     # just return moving to that cell as the best direction, as it results in an instant win
-                    if move_to_cell.get_height == 3:
-                        return [worker, move_dir, build_dir, -1, -1, -1]
-
-                    # Calculate scores
-                    height_score = self._calculate_height_score(worker, move_x, move_y)
-                    center_score = self._calculate_center_score(worker, move_x, move_y)
-                    distance_score = self._calculate_distance_score(worker, move_x, move_y)
-                    move_score = self._calculate_move_score(height_score, center_score, distance_score)
-
-                    # Append all possible move scores to list of move scores
-                    move_scores.append(move_score)
-
-                    # Append all possible move/build directions for each worker to list
-                    move_list.append((worker, move_score, move_dir, build_dir, height_score, center_score, distance_score))
-        
-        # Now that list is populated, find the max move score
+                    if move_to_cell.get_height() == 3:
+                        return [worker, move_dir, build_dir, -1, -1, -1], False
+
+                    candidates.append((worker, move_dir, build_dir, move_x, move_y))
+
+        self._manager.get_profiler().count_candidates('heuristic', len(candidates))
+
+        # A player with no legal moves has no best move
+        if not candidates:
+            return None, False
+
+        # Score every candidate in one batch. With a deadline, score them a chunk at a time instead and stop
+        # once the deadline has passed, keeping the candidates scored so far
+        chunk = len(candidates) if deadline is None else DEADLINE_CHUNK
+        # The board does not change while candidates are scored, so its heights are read once for every chunk
+        heights = self._height_array() if np is not None else None
+        height_scores, center_scores, distance_scores, move_scores = [], [], [], []
+        scored = 0
+        while scored < len(candidates) and (scored == 0 or deadline is None or time.perf_counter() < deadline):
+            chunk_scores = self._score_candidates(candidates[scored:scored + chunk], heights)
+            for scores, new_scores in zip((height_scores, center_scores, distance_scores, move_scores), chunk_scores):
+                scores.extend(new_scores)
+            scored = len(move_scores)
+
+        # Find the indices of every candidate with the max move score
         best_move_score = max(move_scores)
-
-        # Go through each tuple in move_list, and only add tuples that posses the max move score to best_moves_list
-        for entry in move_list:
-            if entry[1] == best_move_score:
-                best_moves_list.append(entry)
+        best_indices = [i for i in range(len(move_scores)) if move_scores[i] == best_move_score]
 
         # If there are multiple moves that yield max move score, randomly choose between one of them
-        if len(best_moves_list) > 1:
-            entry = random.choice(best_moves_list)
-            best_worker = entry[0]
-            best_move_dir = entry[2]
-            best_build_dir = entry[3]
-            height_score = entry[4]
-            center_score = entry[5]
-            distance_score = entry[6]
-        elif len(best_moves_list) == 1:
-            best_worker = best_moves_list[0][0]
-            best_move_dir = best_moves_list[0][2]
-            best_build_dir = best_moves_list[0][3]
-            height_score = best_moves_list[0][4]
-            center_score = best_moves_list[0][5]
-            distance_score = best_moves_list[0][6]
-
-        return [best_worker, best_move_dir, best_build_dir, height_score, center_score, distance_score]
+        if len(best_indices) > 1:
+            index = random.choice(best_indices)
+        else:
+            index = best_indices[0]
+
+        best_worker, best_move_dir, best_build_dir = candidates[index][:3]
+        return [best_worker, best_move_dir, best_build_dir,
+                int(height_scores[index]), int(center_scores[index]), int(distance_scores[index])], \
+            scored < len(candidates)
+
+    def _score_candidates(self, candidates, heights):
+        '''Returns lists of the height, center, distance and move scores of the candidates, calculated in one
+        batch from the board's height array if NumPy is available, else one candidate at a time'''
+        if np is not None:
+            height_scores, center_scores, distance_scores = self._calculate_batch_scores(candidates, heights)
+            move_scores = self._calculate_move_score(height_scores, center_scores, distance_scores)
+            return height_scores.tolist(), center_scores.tolist(), distance_scores.tolist(), move_scores.tolist()
+
+        height_scores, center_scores, distance_scores, move_scores = [], [], [], []
+        for worker, move_dir, build_dir, move_x, move_y in candidates:
+            height_scores.append(self._calculate_height_score(worker, move_x, move_y))
+            center_scores.append(self._calculate_center_score(worker, move_x, move_y))
+            distance_scores.append(self._calculate_distance_score(worker, move_x, move_y))
+            move_scores.append(self._calculate_move_score(height_scores[-1], center_scores[-1], distance_scores[-1]))
+        return height_scores, center_scores, distance_scores, move_scores
+
+    def _height_array(self):
+        '''Returns the height of every cell as a NumPy array indexed [x, y]'''
+        size = self._board.size
+        return np.array([[self._board.get_specific_cell(x, y).get_height() for y in range(size)]
+                         for x in range(size)])
+
+    def _calculate_batch_scores(self, candidates, heights):
+        '''Calculates height, center and distance scores of every candidate at once as NumPy arrays,
+        given the board's heights from _height_array'''
+        workers = self._player.get_workers()
+        players = self._manager.get_both_players()
+        opponent = players[1] if players[0] is self._player else players[0]
+
+        # Position each candidate would move to, and position of the worker that stays put
+        move_x = np.fromiter((candidate[3] for candidate in candidates), dtype=np.int64, count=len(candidates))
+        move_y = np.fromiter((candidate[4] for candidate in candidates), dtype=np.int64, count=len(candidates))
+        moves_first = np.fromiter((candidate[0] is workers[0] for candidate in candidates), dtype=bool,
+                                  count=len(candidates))
+        other_x = np.where(moves_first, workers[1].x, workers[0].x)
+        other_y = np.where(moves_first, workers[1].y, workers[0].y)
+
+        size = self._board.size
+        if size not in _ring_level_arrays:
+            _ring_level_arrays[size] = np.array(self._board.geometry.ring_levels)
+            _distance_arrays[size] = np.array(self._board.geometry.distance)
+        ring_levels = _ring_level_arrays[size]
+        distances = _distance_arrays[size]
+
+        height_scores = heights[move_x, move_y] + heights[other_x, other_y]
+        center_scores = ring_levels[move_x, move_y] + ring_levels[other_x, other_y]
+
+        # Sum over each opponent worker of the Chebyshev distance to the closest of this player's workers
+        moved_squares = move_x * size + move_y
+        other_squares = other_x * size + other_y
+        distance_sum = 0
+        for opponent_worker in opponent.get_workers():
+            opponent_square = opponent_worker.x * size + opponent_worker.y
+            distance_sum = distance_sum + np.minimum(distances[moved_squares, opponent_square],
+                                                     distances[other_squares, opponent_square])
+        distance_scores = 2 * self._board.geometry.max_distance - distance_sum
+
+        return height_scores, center_scores, distance_scores
 
     def _calculate_height_score(self, worker, move_x, move_y):
         '''Calculates height score after given worker is moved'''
@@ -235,7 +412,8 @@ class HeuristicTurn(TurnTemplate):
 
     def _calculate_distance(self, worker1, worker2):
         '''Calculates distance based on two workers' positions'''
-        return max(abs(worker2[1] - worker1[1]), abs(worker2[0] - worker1[0]))
+        size = self._board.size
+        return self._board.geometry.distance[worker1[0] * size + worker1[1]][worker2[0] * size + worker2[1]]
 
     def _calculate_distance_score(self, worker, move_x, move_y):
         '''Calculates distance score after given worker is moved'''
@@ -259,7 +437,7 @@ class HeuristicTurn(TurnTemplate):
             distance_AY = self._calculate_distance((move_x, move_y), (worker_Y.x, worker_Y.y))
             distance_BZ = self._calculate_distance((worker_B.x, worker_B.y), (worker_Z.x, worker_Z.y))
 
-            return 8 - (min(distance_BY, distance_AY) + min(distance_BZ, distance_AZ))
+            return 2 * self._board.geometry.max_distance - (min(distance_BY, distance_AY) + min(distance_BZ, distance_AZ))
         elif worker.name == worker_B.name:
             distance_AZ = self._calculate_distance((worker_A.x, worker_A.y), (worker_Z.x, worker_Z.y))
             distance_BY = self._calculate_distance((move_x, move_y), (worker_Y.x, worker_Y.y))
@@ -267,7 +445,7 @@ class HeuristicTurn(TurnTemplate):
             distance_AY = self._calculate_distance((worker_A.x, worker_A.y), (worker_Y.x, worker_Y.y))
             distance_BZ = self._calculate_distance((move_x, move_y), (worker_Z.x, worker_Z.y))
 
-            return 8 - (min(distance_BY, distance_AY) + min(distance_BZ, distance_AZ))
+            return 2 * self._board.geometry.max_distance - (min(distance_BY, distance_AY) + min(distance_BZ, distance_AZ))
         elif worker.name == worker_Y.name:
             distance_AZ = self._calculate_distance((worker_A.x, worker_A.y), (worker_Z.x, worker_Z.y))
             distance_BY = self._calculate_distance((worker_B.x, worker_B.y), (move_x, move_y))
@@ -275,7 +453,7 @@ class HeuristicTurn(TurnTemplate):
             distance_AY = self._calculate_distance((worker_A.x, worker_A.y), (move_x, move_y))
             distance_BZ = self._calculate_distance((worker_B.x, worker_B.y), (worker_Z.x, worker_Z.y))
 
-            return 8 - (min(distance_AZ, distance_AY) + min(distance_BY, distance_BZ))
+            return 2 * self._board.geometry.max_distance - (min(distance_AZ, distance_AY) + min(distance_BY, distance_BZ))
         elif worker.name == worker_Z.name:
             distance_AZ = self._calculate_distance((worker_A.x, worker_A.y), (move_x, move_y))
             distance_BY = self._calculate_distance((worker_B.x, worker_B.y), (worker_Y.x, worker_Y.y))
@@ -283,11 +461,142 @@ class HeuristicTurn(TurnTemplate):
             distance_AY = self._calculate_distance((worker_A.x, worker_A.y), (worker_Y.x, worker_Y.y))
             distance_BZ = self._calculate_distance((worker_B.x, worker_B.y), (move_x, move_y))
 
-            return 8 - (min(distance_AZ, distance_AY) + min(distance_BY, distance_BZ))
+            return 2 * self._board.geometry.max_distance - (min(distance_AZ, distance_AY) + min(distance_BY, distance_BZ))
     
     def _calculate_move_score(self, height_score, center_score, distance_score):
-        '''Calculates move score using given height, center, and distance score'''
-        c1, c2, c3 = 3, 2, 1
+        '''Calculates move score using given height, center, and distance score, weighted by the player's weights'''
+        c1, c2, c3 = self._player.weights
         return c1 * height_score \
             + c2 * center_score \
-            + c3 * distance_score
\ No newline at end of file
+            + c3 * distance_score
+
+
+class SearchTurn(TurnTemplate):
+    '''Looks several moves ahead with an alpha-beta search and plays the best move found within a time budget'''
+    def __init__(self, board, player, manager, time_budget=1.0):
+        super().__init__(board, player, manager)
+        self._time_budget = time_budget
+
+    def run(self):
+        worker, move_dir, build_dir = self.select_move()
+
+        # Move and build in the best direction found
+        self._player.move(worker, move_dir)
+        self._player.build(worker, build_dir)
+
+        # Print move stats
+        self._display_move(worker, move_dir, build_dir)
+
+    def _select_move_by(self, deadline):
+        '''Returns the best (worker, move direction, build direction) found by the search within its time budget,
+        or by the deadline if that comes first, and whether the search was stopped by the clock'''
+        book_move = self._book_move()
+        if book_move is not None:
+            return book_move, False, None
+
+        time_budget = self._time_budget
+        if deadline is not None:
+            time_budget = min(time_budget, max(0.0, deadline - time.perf_counter()))
+        players = self._manager.get_both_players()
+        opponent = players[1] if players[0] is self._player else players[0]
+        search = AlphaBetaSearch(BitBoard.from_board(self._board),
+                                 [worker.name for worker in self._player.get_workers()],
+                                 [worker.name for worker in opponent.get_workers()],
+                                 time_budget,
+                                 weights=self._player.weights,
+                                 table=self._manager.get_transposition_table(self._player),
+                                 blue_to_move=self._player.color == 'blue')
+        action = search.search()
+        self._manager.get_profiler().count_candidates('search', search.nodes)
+        if action is None:
+            return None, False, None
+        worker_name, move_square, build_square = action
+
+        worker = self._player.select_worker(worker_name)
+        from_square = worker.x * BOARD_SIZE + worker.y
+        return (worker, SQUARE_DIRECTION[from_square][move_square], SQUARE_DIRECTION[move_square][build_square]), \
+            search.timed_out, None
+
+
+class MCTSTurn(TurnTemplate):
+    '''Chooses the move visited most by a Monte Carlo Tree Search, with playouts spread over a process pool.
+    Searches for a number of playouts, or for a time limit in seconds if one is given'''
+    def __init__(self, board, player, manager, playouts=2000, time_limit=None, jobs=None):
+        super().__init__(board, player, manager)
+        self._playouts = playouts
+        self._time_limit = time_limit
+        self._jobs = jobs
+
+    def run(self):
+        worker, move_dir, build_dir = self.select_move()
+
+        # Move and build in the most visited direction
+        self._player.move(worker, move_dir)
+        self._player.build(worker, build_dir)
+
+        # Print move stats
+        self._display_move(worker, move_dir, build_dir)
+
+    def _select_move_by(self, deadline):
+        '''Returns the (worker, move direction, build direction) chosen by the tree search, and whether the
+        deadline cut the search short. Searches for at most the time left before the deadline; if no tree has
+        reported back by then, plays the root move that climbs highest'''
+        book_move = self._book_move()
+        if book_move is not None:
+            return book_move, False, None
+
+        players = self._manager.get_both_players()
+        opponent = players[1] if players[0] is self._player else players[0]
+
+        # Root moves come from the workers' own move enumeration, one per group of symmetric moves
+        root_actions = []
+        for worker in self._player.get_workers():
+            for move_dir, builds in worker.enumerate_moves(self._board).items():
+                move_x = worker.x + DIRECTION[move_dir]['x']
+                move_y = worker.y + DIRECTION[move_dir]['y']
+                for build_dir in builds:
+                    build_x = move_x + DIRECTION[build_dir]['x']
+                    build_y = move_y + DIRECTION[build_dir]['y']
+                    root_actions.append((worker.name, move_x * BOARD_SIZE + move_y, build_x * BOARD_SIZE + build_y))
+        root_actions = unique_actions(Position.from_board(self._board), root_actions)
+
+        if not root_actions:
+            return None, False, None
+
+        playouts = None if self._time_limit is not None else self._playouts
+        time_limit = self._time_limit
+        limited = False
+        if deadline is not None:
+            remaining = max(0.0, deadline - time.perf_counter())
+            limited = time_limit is None or remaining < time_limit
+            time_limit = remaining if time_limit is None else min(time_limit, remaining)
+        bitboard = BitBoard.from_board(self._board)
+        action, stats = parallel_search(
+            bitboard,
+            [worker.name for worker in self._player.get_workers()],
+            [worker.name for worker in opponent.get_workers()],
+            root_actions, playouts, time_limit, self._jobs, deadline=deadline)
+        visits = sum(visits for visits, _ in stats.values())
+        self._manager.get_profiler().count_candidates('mcts', visits)
+        if action is None:
+            action = max(root_actions, key=lambda root_action: bitboard.heights[root_action[1]])
+        worker_name, move_square, build_square = action
+
+        worker = self._player.select_worker(worker_name)
+        from_square = worker.x * BOARD_SIZE + worker.y
+        return (worker, SQUARE_DIRECTION[from_square][move_square], SQUARE_DIRECTION[move_square][build_square]), \
+            limited and (playouts is None or visits < playouts), None
+
+
+# Turn of every player type. The order of the types is part of the record file format
+TURNS = {
+    'human': HumanTurn,
+    'random': RandomTurn,
+    'heuristic': HeuristicTurn,
+    'search': SearchTurn,
+    'mcts': MCTSTurn,
+}
+PLAYER_TYPES = list(TURNS)
+
+# Computer-controlled turns, which choose their moves without prompts
+COMPUTER_TURNS = {player_type: turn for player_type, turn in TURNS.items() if turn is not HumanTurn}
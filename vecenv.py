@@ -0,0 +1,194 @@
+import argparse
+import time
+import numpy as np
+from geometry import BOARD_SIZE, get_geometry
+from player import DIRECTIONS
+
+# Action codes as in player.encode_action: worker (0-1) x move direction (0-7) x build direction (0-7)
+NUM_ACTIONS = 2 * len(DIRECTIONS) * len(DIRECTIONS)
+
+# Worker columns of the workers array, white's then blue's
+WORKER_NAMES = ['A', 'B', 'Y', 'Z']
+
+NO_WINNER = -1
+
+
+def _next_squares(size):
+    '''Returns next[square, direction] -> neighbor square, with one extra off-board square (size * size)
+    that every missing neighbor, and every neighbor of the off-board square, points to'''
+    off_board = size * size
+    next_squares = np.full((off_board + 1, len(DIRECTIONS)), off_board, dtype=np.intp)
+    for x, row in enumerate(get_geometry(size).adjacent):
+        for y, neighbors in enumerate(row):
+            for dir, new_x, new_y in neighbors:
+                next_squares[x * size + y, DIRECTIONS.index(dir)] = new_x * size + new_y
+    return next_squares
+
+# {board size: (next squares, square bits, move bits, build bits)}. Sets of squares are held as one bit per
+# square, in 32-bit integers up to 5x5 and 64-bit integers above; move_bits[square, move] is the bit of the
+# square moved to and build_bits[square, move, build] the bit of the square built on after moving from square
+_tables = {}
+
+
+def _get_tables(size):
+    '''Returns the shared move and build tables of a board size'''
+    if size not in _tables:
+        next_squares = _next_squares(size)
+        dtype = np.uint32 if len(next_squares) <= 32 else np.uint64
+        square_bits = np.left_shift(1, np.arange(len(next_squares), dtype=dtype)).astype(dtype)
+        _tables[size] = (next_squares, square_bits, square_bits[next_squares], square_bits[next_squares[next_squares]])
+    return _tables[size]
+
+
+class VecEnv:
+    '''Plays N games in lockstep on NumPy arrays: heights (N, size * size), worker squares (N, 4) in
+    A, B, Y, Z order, turn counts, and winners (0 white, 1 blue, NO_WINNER while playing).
+    White moves on odd turns and blue on even turns, with the rules of Cell.is_valid_move and
+    Cell.is_valid_build, and a game ends as in GameManager.get_winner'''
+    def __init__(self, games, size=BOARD_SIZE):
+        if size * size + 1 > 64:
+            raise ValueError("VecEnv holds the squares of a board in 64-bit masks, so boards are at most 7x7")
+        self.games = games
+        self.size = size
+        self._next, self._square_bits, self._move_bits, self._build_bits = _get_tables(size)
+        # Bit weights for packing squares with a matrix product, exact as boards have at most 50 squares
+        self._bit_weights = self._square_bits.astype(np.float64)
+        self._rows = np.arange(games)
+        # Heights are stored with one extra off-board square of height 4 per game, which is never a legal
+        # move or build; self.heights is a view without it
+        self._heights = np.zeros((games, size * size + 1), dtype=np.int8)
+        self._heights[:, -1] = 4
+        self.heights = self._heights[:, :-1]
+        self.workers = np.zeros((games, 4), dtype=np.intp)
+        self.turns = np.zeros(games, dtype=np.int32)
+        self.winners = np.full(games, NO_WINNER, dtype=np.int8)
+        self._mask = np.zeros((games, NUM_ACTIONS), dtype=bool)
+        self.reset()
+
+    def reset(self, games=None):
+        '''Sets the given games (all by default; an index array or boolean mask) to the starting position'''
+        games = self._rows if games is None else games
+        size = self.size
+        self.heights[games] = 0
+        self.workers[games] = [(size - 2) * size + 1, size + size - 2, size + 1, (size - 2) * size + size - 2]
+        self.turns[games] = 1
+        self.winners[games] = NO_WINNER
+        self._update(self._rows[games])
+
+    def set_state(self, index, game):
+        '''Copies the position and turn count of a GameState into game index'''
+        board = game.get_board()
+        for x in range(self.size):
+            for y in range(self.size):
+                self.heights[index, x * self.size + y] = board.get_specific_cell(x, y).get_height()
+        for column, name in enumerate(WORKER_NAMES):
+            worker = game.get_worker(name)
+            self.workers[index, column] = worker.x * self.size + worker.y
+        self.turns[index] = game.get_turncount()
+        self.winners[index] = NO_WINNER
+        self._update(self._rows[index:index + 1])
+
+    def sides(self):
+        '''Returns the side to move of every game, 0 for white and 1 for blue'''
+        return 1 - (self.turns & 1)
+
+    def done(self):
+        '''Returns a boolean array of the games that have ended'''
+        return self.winners != NO_WINNER
+
+    def legal_mask(self):
+        '''Returns the (N, NUM_ACTIONS) boolean array of legal action codes of the side to move.
+        Ended games have no legal actions'''
+        return self._mask
+
+    def step(self, actions):
+        '''Plays one action code in every game that has not ended; actions of ended games are ignored.
+        Raises ValueError if an action is illegal. Returns the winners array'''
+        actions = np.asarray(actions, dtype=np.intp)
+        active = ~self.done()
+        rows = self._rows[active]
+        actions = actions[active]
+        if not self._mask[rows, actions].all():
+            raise ValueError("Illegal action in a game that has not ended")
+
+        sides = self.sides()[rows]
+        columns = 2 * sides + (actions >> 6)
+        to_squares = self._next[self.workers[rows, columns], (actions >> 3) & 7]
+        build_squares = self._next[to_squares, actions & 7]
+        self.workers[rows, columns] = to_squares
+        self.heights[rows, build_squares] += 1
+        self.turns[rows] += 1
+
+        # Moving onto level 3 wins; the next update ends games whose side to move cannot move
+        winning = self.heights[rows, to_squares] == 3
+        self.winners[rows[winning]] = sides[winning]
+        self._update(rows)
+        return self.winners
+
+    def random_actions(self, rng):
+        '''Returns one uniformly random legal action code per game (0 for ended games), drawn from a NumPy Generator'''
+        counts = self._mask.sum(axis=1)
+        # Flat indices of every legal action, grouped by game
+        legal = np.flatnonzero(self._mask)
+        if len(legal) == 0:
+            return np.zeros(self.games, dtype=np.intp)
+        picks = np.cumsum(counts) - counts + (rng.random(self.games) * counts).astype(np.intp)
+        actions = legal[np.minimum(picks, len(legal) - 1)] - self._rows * NUM_ACTIONS
+        actions[counts == 0] = 0
+        return actions
+
+    def _bits(self, squares):
+        '''Packs a boolean array of squares, with squares on the last axis, into one bit set per row'''
+        return (squares @ self._bit_weights).astype(self._square_bits.dtype)
+
+    def _update(self, rows):
+        '''Recomputes the legal mask of the given games, and ends those whose side to move has no legal move'''
+        heights = self._heights[rows]
+        workers = self.workers[rows]
+        local_rows = np.arange(len(rows))[:, None]
+        occupied = np.zeros(heights.shape, dtype=bool)
+        occupied[local_rows, workers] = True
+        free = (heights < 4) & ~occupied
+
+        sides = 1 - (self.turns[rows] & 1)
+        from_squares = workers[local_rows, 2 * sides[:, None] + np.arange(2)]
+        from_heights = heights[local_rows, from_squares]
+
+        # Moves: (games, worker, move direction). climb_bits[:, h] are the free squares of height h + 1 or less
+        climb_bits = self._bits(free[:, None, :] & (heights[:, None, :] <= np.array([[1], [2], [3]])))
+        reachable = climb_bits[local_rows, np.minimum(from_heights, 2)]
+        can_move = (reachable[:, :, None] & self._move_bits[from_squares]) != 0
+
+        # Builds: (games, worker, move direction, build direction); the square just left is free to build on
+        buildable = self._bits(free)[:, None] | self._square_bits[from_squares]
+        can_build = (buildable[:, :, None, None] & self._build_bits[from_squares]) != 0
+
+        mask = (can_move[:, :, :, None] & can_build).reshape(len(rows), NUM_ACTIONS)
+        winners = self.winners[rows]
+        stuck = (winners == NO_WINNER) & ~mask.any(axis=1)
+        winners[stuck] = 1 - sides[stuck]
+        mask[winners != NO_WINNER] = False
+        self.winners[rows] = winners
+        self._mask[rows] = mask
+
+
+def bench(games=10000, turns=200, seed=0):
+    '''Plays random games in lockstep, resetting each game as it ends, and returns turns per second'''
+    env = VecEnv(games)
+    rng = np.random.default_rng(seed)
+    played = 0
+    start = time.perf_counter()
+    for _ in range(turns):
+        played += int((~env.done()).sum())
+        env.step(env.random_actions(rng))
+        if env.done().any():
+            env.reset(env.done())
+    return played / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time random games played in lockstep by the vectorized environment")
+    parser.add_argument('-n', '--games', type=int, default=10000, help="games played at once (default: 10000)")
+    parser.add_argument('--turns', type=int, default=200, help="steps to time (default: 200)")
+    args = parser.parse_args()
+    print(f"{bench(args.games, args.turns):,.0f} turns/s")
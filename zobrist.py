@@ -0,0 +1,164 @@
+import random
+from collections import OrderedDict
+from geometry import BOARD_SIZE
+
+# Keys are drawn from a fixed seed so a position hashes the same in every process and every run
+_rng = random.Random(0x5A7041)
+
+# HEIGHT_KEYS[square][height] -> key of a building of that height; an empty square (height 0) hashes to 0
+HEIGHT_KEYS = tuple(
+    (0,) + tuple(_rng.getrandbits(64) for _ in range(4)) for _ in range(BOARD_SIZE * BOARD_SIZE)
+)
+
+# WORKER_KEYS[worker name][square] -> key of that worker standing on that square
+WORKER_KEYS = {
+    name: tuple(_rng.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)) for name in 'ABYZ'
+}
+
+# Toggled in when blue is to move
+SIDE_KEY = _rng.getrandbits(64)
+
+
+# {board size: (height keys, worker keys)} of board sizes other than the default
+_sized_keys = {BOARD_SIZE: (HEIGHT_KEYS, WORKER_KEYS)}
+
+
+def get_keys(size=BOARD_SIZE):
+    '''Returns the (height keys, worker keys) tables of a board size, indexed like HEIGHT_KEYS and WORKER_KEYS.
+    Sizes other than the default draw their keys from their own fixed seed'''
+    if size not in _sized_keys:
+        rng = random.Random(0x5A7041 ^ size)
+        height_keys = tuple((0,) + tuple(rng.getrandbits(64) for _ in range(4)) for _ in range(size * size))
+        worker_keys = {name: tuple(rng.getrandbits(64) for _ in range(size * size)) for name in 'ABYZ'}
+        _sized_keys[size] = (height_keys, worker_keys)
+    return _sized_keys[size]
+
+
+def hash_board(board, blue_to_move=False):
+    '''Computes the hash of a Board's heights and workers from scratch'''
+    height_keys, worker_keys = get_keys(board.size)
+    key = SIDE_KEY if blue_to_move else 0
+    for x in range(board.size):
+        for y in range(board.size):
+            cell = board.get_specific_cell(x, y)
+            square = x * board.size + y
+            key ^= height_keys[square][cell.get_height()]
+            if cell.is_occupied():
+                key ^= worker_keys[cell.get_occupying_worker()][square]
+    return key
+
+
+
+def hash_position(position):
+    '''Computes the hash of a position.Position, matching hash_board of the same heights, workers and side to move'''
+    height_keys, worker_keys = get_keys(position.size)
+    key = SIDE_KEY if position.turn % 2 == 0 else 0
+    for square, height in enumerate(position.heights):
+        key ^= height_keys[square][height]
+    for name, square in zip('ABYZ', position.workers):
+        key ^= worker_keys[name][square]
+    return key
+
+# Bound types stored with a score
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    '''Stores search results by position hash: depth, bound type, score and best move.
+    Holds at most max_bytes worth of entries, replacing either the least recently used entry ('lru')
+    or, in a fixed array of slots, the shallower entry ('depth').
+    Entries are kept as flat tuples of ints and strings, with the best move's items spliced in. The garbage
+    collector stops tracking such a tuple the first time it sees it, so a large table adds no work to later
+    collections and does not pile up objects that set off full collections in the middle of a timed move'''
+    # Approximate size of one stored entry: the entry tuple, its items and the table slot
+    ENTRY_BYTES = 240
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, replacement='lru'):
+        if replacement not in ('lru', 'depth'):
+            raise ValueError(f"Unknown replacement policy '{replacement}'")
+        self._capacity = max(1, max_bytes // self.ENTRY_BYTES)
+        self._replacement = replacement
+        if replacement == 'lru':
+            self._entries = OrderedDict()
+        else:
+            self._slots = [None] * self._capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stores = 0
+
+    def get(self, key):
+        '''Returns the (depth, bound, score, best move) stored for the key, or None'''
+        if self._replacement == 'lru':
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            depth, bound, score, *best_move = entry
+        else:
+            entry = self._slots[key % self._capacity]
+            if entry is None or entry[0] != key:
+                self.misses += 1
+                return None
+            _, depth, bound, score, *best_move = entry
+        self.hits += 1
+        return depth, bound, score, tuple(best_move) if best_move else None
+
+    def store(self, key, depth, bound, score, best_move):
+        '''Stores a search result for the key, evicting another entry if the table is full.
+        The best move is a tuple of ints and strings, or None'''
+        self.stores += 1
+        if self._replacement == 'lru':
+            entries = self._entries
+            if key in entries:
+                entries.move_to_end(key)
+            elif len(entries) >= self._capacity:
+                entries.popitem(last=False)
+                self.evictions += 1
+            entries[key] = (depth, bound, score) + best_move if best_move else (depth, bound, score)
+        else:
+            index = key % self._capacity
+            entry = self._slots[index]
+            if entry is not None and entry[0] != key:
+                # Keep the deeper of the two results
+                if entry[1] > depth:
+                    return
+                self.evictions += 1
+            self._slots[index] = (key, depth, bound, score) + best_move if best_move else (key, depth, bound, score)
+
+    def __len__(self):
+        if self._replacement == 'lru':
+            return len(self._entries)
+        return sum(1 for entry in self._slots if entry is not None)
+
+    def clear(self):
+        '''Removes every entry; counters are kept'''
+        if self._replacement == 'lru':
+            self._entries.clear()
+        else:
+            self._slots = [None] * self._capacity
+
+    def stats(self):
+        '''Returns the table's counters and size, to help size the table for a host'''
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self),
+            'capacity': self._capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+        }
+
+
+if __name__ == '__main__':
+    # Report the measured size of a full table, to check ENTRY_BYTES
+    import tracemalloc
+    tracemalloc.start()
+    table = TranspositionTable(max_bytes=10000 * TranspositionTable.ENTRY_BYTES)
+    for key in range(10000):
+        table.store(random.getrandbits(64), 3, EXACT, key - 5000, ('A', 12, 17))
+    size, _ = tracemalloc.get_traced_memory()
+    print(f"{size / len(table):.0f} bytes per entry (ENTRY_BYTES = {TranspositionTable.ENTRY_BYTES})")